@@ -26,22 +26,31 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import bisect
+import operator
+import re
+import sys
+
 try:
     import HTMLParser
 except ImportError:
     import html.parser as HTMLParser
-import re
-import sys
-
+try:
+    # Python 3.4+ provides a module level function.
+    from html import unescape  # pylint: disable=no-name-in-module
+except ImportError:
+    # HTMLParser.unescape does not depend on the parser state, so a single
+    # instance can be shared.
+    _UNESCAPE_PARSER = HTMLParser.HTMLParser()
 
-def unescape(code):
-    """Utility function to unescape a string with HTML entities."""
-    parser = HTMLParser.HTMLParser()
-    return parser.unescape(code)
+    def unescape(code):
+        """Utility function to unescape a string with HTML entities."""
+        return _UNESCAPE_PARSER.unescape(code)
 
 
 class UnicodeMixin(object):
     """Mixin class to handle defining the proper __str__/__unicode__ methods."""
+    __slots__ = ()
 
     if sys.version_info[0] >= 3:  # Python 3
         def __str__(self):
@@ -55,17 +64,40 @@ class UnicodeMixin(object):
 
 
 class Message(UnicodeMixin):
+    # The message is stored as a format string and its arguments, so to only
+    # format it when it is actually read.
+    __slots__ = ('line', 'column', '_fmt', '_args')
+
     level = 'Error'
     category = None
     description = None
-    message = None
 
     def __init__(self, line, column):
         self.column = column
         self.line = line
+        self._fmt = None
+        self._args = None
+
+    @property
+    def message(self):
+        # Without arguments, the message is used as is.
+        if self._args is None:
+            return self._fmt
+        return self._fmt % self._args
+
+    @message.setter
+    def message(self, message):
+        self._fmt = message
+        self._args = None
 
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        return (type(self) is type(other) and
+                self.line == other.line and
+                self.column == other.column and
+                self.message == other.message)
+
+    def __ne__(self, other):
+        return not self == other
 
     def __unicode__(self):
         return ('%d:%d: %s: %s: %s: %s.' % (self.line,
@@ -80,26 +112,43 @@ class Message(UnicodeMixin):
 
 
 class DocumentTypeMessage(Message):
+    __slots__ = ()
+
     category = 'Document Type'
     description = 'Use HTML5'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Document_Type#Document_Type'
 
     def __init__(self, line, column, declaration):
         Message.__init__(self, line, column)
-        self.message = 'Change "%s" to "%s"' % (declaration, '<!DOCTYPE html>')
+        self._fmt = 'Change "%s" to "%s"'
+        self._args = (declaration, '<!DOCTYPE html>')
 
 
 class EntityReferenceMessage(Message):
+    __slots__ = ()
+
     category = 'Entity References'
     description = 'Use the unicode equivalent instead'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Entity_References#Entity_References'
 
     def __init__(self, line, column, entity):
         Message.__init__(self, line, column)
-        self.message = 'Change "%s" to "%s"' % (entity, unescape(entity))
+        self._fmt = 'Change "%s" to "%s"'
+        self._args = (entity,)
+
+    # Keeps the setter of Message.message.
+    @Message.message.getter
+    def message(self):
+        if self._args is None:
+            return self._fmt
+        # The entity is only unescaped when the message is rendered.
+        entity, = self._args
+        return self._fmt % (entity, unescape(entity))
 
 
 class TrailingWhitespaceMessage(Message):
+    __slots__ = ()
+
     category = 'Trailing Whitespace'
     description = ('Trailing white spaces are unnecessary and can complicate ' +
                    'diffs')
@@ -107,20 +156,25 @@ class TrailingWhitespaceMessage(Message):
 
     def __init__(self, line, column, whitespace):
         Message.__init__(self, line, column)
-        self.message = 'Remove the %s at the end of the line' % repr(whitespace)
+        self._fmt = 'Remove the %r at the end of the line'
+        self._args = (whitespace,)
 
 
 class TabMessage(Message):
+    __slots__ = ()
+
     category = 'Indentation'
     description = 'Do not use tabs'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Indentation#Indentation'
 
     def __init__(self, line, column):
         Message.__init__(self, line, column)
-        self.message = 'Remove the tabs'
+        self._fmt = 'Remove the tabs'
 
 
 class CharsetMessage(Message):
+    __slots__ = ()
+
     category = 'Encoding'
     description = 'The meta charset should be set to utf-8'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Encoding#Encoding'
@@ -128,12 +182,15 @@ class CharsetMessage(Message):
     def __init__(self, line, column, charset=None):
         Message.__init__(self, line, column)
         if charset:
-            self.message = 'Change the charset from "%s" to "utf-8"' % charset
+            self._fmt = 'Change the charset from "%s" to "utf-8"'
+            self._args = (charset,)
         else:
-            self.message = 'Add the tag <meta charset="utf-8">'
+            self._fmt = 'Add the tag <meta charset="utf-8">'
 
 
 class VoidElementMessage(Message):
+    __slots__ = ()
+
     category = 'Document Type'
     description = 'Do not close void elements'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Document_Type#Document_Type'
@@ -141,14 +198,17 @@ class VoidElementMessage(Message):
     def __init__(self, line, column, tag, trailing_chars=None):
         Message.__init__(self, line, column)
         if trailing_chars is None:
-            self.message = ('Remove the closing %s tag, it is a huge ' +
-                            'conceptual error to close it') % tag
+            self._fmt = ('Remove the closing %s tag, it is a huge ' +
+                         'conceptual error to close it')
+            self._args = (tag,)
         else:
-            self.message = ('Remove the trailing "%s" from the %s tag' %
-                            (trailing_chars, tag))
+            self._fmt = 'Remove the trailing "%s" from the %s tag'
+            self._args = (trailing_chars, tag)
 
 
 class OptionalTagMessage(Message):
+    __slots__ = ()
+
     category = 'Optional Tags'
     description = 'Omit optional tags (optional)'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Optional_Tags#Optional_Tags'
@@ -159,26 +219,56 @@ class OptionalTagMessage(Message):
         tag_type = 'closing'
         if opening:
             tag_type = 'opening'
-        self.message = 'You may remove the %s "%s" tag' % (tag_type, tag)
+        self._fmt = 'You may remove the %s "%s" tag'
+        self._args = (tag_type, tag)
+
 
+_DEFAULT_TYPES = {
+    'link': 'text/css',
+    'style': 'text/css',
+    'script': 'text/javascript',
+}
+
+
+class _DescriptionFormatMessage(Message):
+    # Like the message, the description is only formatted when it is read.
+    __slots__ = ('_description_fmt', '_description_args')
+
+    def __init__(self, line, column):
+        Message.__init__(self, line, column)
+        self._description_fmt = None
+        self._description_args = None
+
+    @property
+    def description(self):
+        if self._description_args is None:
+            return self._description_fmt
+        return self._description_fmt % self._description_args
+
+    @description.setter
+    def description(self, description):
+        self._description_fmt = description
+        self._description_args = None
+
+
+class TypeAttributeMessage(_DescriptionFormatMessage):
+    __slots__ = ()
 
-class TypeAttributeMessage(Message):
     category = 'type Attributes'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=type_Attributes#type_Attributes'
 
     def __init__(self, line, column, tag):
-        Message.__init__(self, line, column)
-        default_type = 'unknown'
-        if tag in ('link', 'style'):
-            default_type = 'text/css'
-        elif tag == 'script':
-            default_type = 'text/javascript'
-        self.description = ('The default type for %s tags is "%s" so it can ' +
-                            'be safely omitted') % (tag, default_type)
-        self.message = 'Remove the type attribute from the %s tag' % tag
+        _DescriptionFormatMessage.__init__(self, line, column)
+        self._description_fmt = ('The default type for %s tags is "%s" so it ' +
+                                 'can be safely omitted')
+        self._description_args = (tag, _DEFAULT_TYPES.get(tag, 'unknown'))
+        self._fmt = 'Remove the type attribute from the %s tag'
+        self._args = (tag,)
 
 
 class ConcernsSeparationMessage(Message):
+    __slots__ = ('description',)
+
     category = 'Separation of concerns'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Separation_of_Concerns#Separation_of_Concerns'
 
@@ -186,25 +276,31 @@ class ConcernsSeparationMessage(Message):
         Message.__init__(self, line, column)
         if tag == 'script':
             self.description = 'Javascript should be defined in its own file'
-            self.message = 'Move the contents of this tag to its own JS file'
+            self._fmt = 'Move the contents of this tag to its own JS file'
         elif tag == 'style':
             self.description = 'CSS should be defined in its own file',
-            self.message = 'Move the contents of this tag to its own CSS file'
+            self._fmt = 'Move the contents of this tag to its own CSS file'
         elif tag == 'a' and attribute == 'href':
             self.description = 'Javascript should be defined in its own file'
-            self.message = ('Move the contents of the "href" attribute to its' +
-                            ' own JS file')
+            self._fmt = ('Move the contents of the "href" attribute to its' +
+                         ' own JS file')
         elif attribute == 'style':
             self.description = 'CSS should be defined in its own file'
-            self.message = ('Move the contents of the "style" attribute to ' +
-                            'its own CSS file')
+            self._fmt = ('Move the contents of the "style" attribute to ' +
+                         'its own CSS file')
         elif attribute.startswith('on'):
             self.description = 'Javascript should be defined in its own file'
-            self.message = ('Register the handler for "%s" with events in a ' +
-                            'JS file') % attribute
+            self._fmt = ('Register the handler for "%s" with events in a ' +
+                         'JS file')
+            self._args = (attribute,)
+        else:
+            # The message is left unset by Message.__init__.
+            self.description = None
 
 
 class ProtocolMessage(Message):
+    __slots__ = ()
+
     category = 'Protocol'
     description = 'Do not specify the protocol unless required'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Protocol#Protocol'
@@ -212,22 +308,28 @@ class ProtocolMessage(Message):
 
     def __init__(self, line, column, protocol):
         Message.__init__(self, line, column)
-        self.message = 'Remove the protocol "%s" from the url' % protocol
+        self._fmt = 'Remove the protocol "%s" from the url'
+        self._args = (protocol,)
+
 
+class NameMessage(_DescriptionFormatMessage):
+    __slots__ = ()
 
-class NameMessage(Message):
     category = 'ID and Class Name Delimiters'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=ID_and_Class_Name_Delimiters#ID_and_Class_Name_Delimiters'
 
     def __init__(self, line, column, attribute, value):
-        Message.__init__(self, line, column)
-        self.description = ('The %s names should be lowercase and with ' +
-                            'hyphens instead of underscores') % attribute
-        self.message = ('Remove the offending characters from the %s "%s"' %
-                        (attribute, value))
+        _DescriptionFormatMessage.__init__(self, line, column)
+        self._description_fmt = ('The %s names should be lowercase and with ' +
+                                 'hyphens instead of underscores')
+        self._description_args = (attribute,)
+        self._fmt = 'Remove the offending characters from the %s "%s"'
+        self._args = (attribute, value)
 
 
 class CapitalizationMessage(Message):
+    __slots__ = ('description',)
+
     category = 'Capitalization'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Capitalization#Capitalization'
 
@@ -237,36 +339,44 @@ class CapitalizationMessage(Message):
         Message.__init__(self, line, column)
         if attribute is None:
             self.description = 'Tags should be in lowercase'
-            self.message = ('Change the %s tag "%s" to "%s"' %
-                            (self.TAG_TYPE[closing], tag, tag.lower()))
+            self._fmt = 'Change the %s tag "%s" to "%s"'
+            self._args = (self.TAG_TYPE[closing], tag, tag.lower())
         else:
             self.description = 'Attributes should be in lowercase'
-            self.message = ('Change the attribute "%s" to "%s"' %
-                            (attribute, attribute.lower()))
+            self._fmt = 'Change the attribute "%s" to "%s"'
+            self._args = (attribute, attribute.lower())
 
 
 class QuotationMessage(Message):
+    __slots__ = ()
+
     category = 'HTML Quotation Marks'
     description = 'Use only double quotes'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=HTML_Quotation_Marks#HTML_Quotation_Marks'
 
     def __init__(self, line, column, quotation=''):
         Message.__init__(self, line, column)
-        self.message = 'Change the quotation mark %s to \'"\'' % quotation
+        self._fmt = 'Change the quotation mark %s to \'"\''
+        self._args = (quotation,)
 
 
 class IndentationMessage(Message):
+    __slots__ = ()
+
     category = 'Indentation'
     description = 'Use two spaces and no tabs'
     url = 'https://google-styleguide.googlecode.com/svn/trunk/htmlcssguide.xml?showone=Indentation#Indentation'
 
     def __init__(self, line, column, indent, min_indent=0, max_indent=0):
         Message.__init__(self, line, column)
-        self.message = ('Was expecting between %d and %d (in multiples of 2) ' +
-                        'spaces but got %d') % (min_indent, max_indent, indent)
+        self._fmt = ('Was expecting between %d and %d (in multiples of 2) ' +
+                     'spaces but got %d')
+        self._args = (min_indent, max_indent, indent)
 
 
 class FormattingMessage(Message):
+    __slots__ = ()
+
     category = 'General Formatting'
     description = ('Use a new line for every block, list, or table element, ' +
                    'and indent every such child element')
@@ -274,10 +384,13 @@ class FormattingMessage(Message):
 
     def __init__(self, line, column, tag):
         Message.__init__(self, line, column)
-        self.message = 'Move the opening "%s" to its own line' % tag
+        self._fmt = 'Move the opening "%s" to its own line'
+        self._args = (tag,)
 
 
 class BooleanAttributeMessage(Message):
+    __slots__ = ()
+
     category = 'Boolean Attributes'
     description = ('Boolean attributes define their value based on the ' +
                    'presence or abscence of the attribute')
@@ -285,55 +398,90 @@ class BooleanAttributeMessage(Message):
 
     def __init__(self, line, column, attribute, value):
         Message.__init__(self, line, column)
-        self.message = ('Change \'%s="%s"\' to just \'%s\'' %
-                        (attribute, value, attribute))
+        self._fmt = 'Change \'%s="%s"\' to just \'%s\''
+        self._args = (attribute, value, attribute)
+
+
+_INVALID_ATTRIBUTE_MESSAGES = {
+    'charset': (
+        'The attribute "charset" applies only to external resources',
+        'Remove the "charset" attribute',
+        'http://perfectionkills.com/optimizing-html/#8_script_charset'),
+    'language': (
+        'The attribute "language" was deprecated more than 10 years ago',
+        'Remove the "language" attribute',
+        ('http://perfectionkills.com/optimizing-html/'
+         '#7_script_language_javascript')),
+    'name': (
+        'The attribute "name" is no longer required for anchors',
+        'Remove the "name" attribute and replace it with and id if required',
+        'http://perfectionkills.com/optimizing-html/#5_a_id_name'),
+}
 
 
 class InvalidAttributeMessage(Message):
+    __slots__ = ('description', 'url')
+
     category = 'Invalid Attributes'
 
     def __init__(self, line, column, attribute):
         Message.__init__(self, line, column)
-        if attribute == 'charset':
-            self.description = ('The attribute "charset" applies only to ' +
-                                'external resources')
-            self.message = 'Remove the "charset" attribute'
-            self.url = 'http://perfectionkills.com/optimizing-html/#8_script_charset'
-        elif attribute == 'language':
-            self.description = ('The attribute "language" was deprecated more' +
-                                ' than 10 years ago')
-            self.message = 'Remove the "language" attribute'
-            self.url = 'http://perfectionkills.com/optimizing-html/#7_script_language_javascript'
-        elif attribute == 'name':
-            self.description = ('The attribute "name" is no longer required ' +
-                                'for anchors')
-            self.message = ('Remove the "name" attribute and replace it with ' +
-                            'and id if required')
-            self.url = 'http://perfectionkills.com/optimizing-html/#5_a_id_name'
+        texts = _INVALID_ATTRIBUTE_MESSAGES.get(attribute)
+        if texts is None:
+            # The message is left unset by Message.__init__.
+            self.description = None
+        else:
+            self.description, self._fmt, self.url = texts
 
 
 class VoidZeroMessage(Message):
+    __slots__ = ()
+
     category = 'Javascript Links'
     description = ('It is bad practice to use javascript:void(0) to prevent ' +
                    'the default and it also prevents the use of CSP')
     url = 'http://perfectionkills.com/optimizing-html/#5_href_javascript_void'
-    message = ('Change the "href" attribute to href="#" or disable the ' +
-               'default by attaching an onclick event to this element and ' +
-               'using e.preventdefault()')
+
+    def __init__(self, line, column):
+        Message.__init__(self, line, column)
+        self._fmt = ('Change the "href" attribute to href="#" or disable ' +
+                     'the default by attaching an onclick event to this ' +
+                     'element and using e.preventdefault()')
 
 
 class InvalidHandlerMessage(Message):
+    __slots__ = ()
+
     category = 'Javascript Links'
     description = 'Event handlers should not have the javascript protocol'
     url = 'http://perfectionkills.com/optimizing-html/#4_onclick_javascript'
 
     def __init__(self, line, column, attribute):
         Message.__init__(self, line, column)
-        self.message = ('Remove the "javascript:" prefix from the "%s" ' +
-                        'attribute') % attribute
+        self._fmt = ('Remove the "javascript:" prefix from the "%s" ' +
+                     'attribute')
+        self._args = (attribute,)
+
+
+_HTTP_EQUIV_MESSAGES = {
+    'content-language': (
+        'Specify the language in the html tag, see '
+        'http://www.w3.org/International/questions/qa-http-and-lang.en#answer'),
+    'content-type': 'Replace this by <meta charset="utf-8">',
+    'set-cookie': (
+        'The http-equiv "%(http_equiv)s" directive is non conformant, '
+        'avoid it'),
+    'pragma': (
+        'HTML5 does not allow the http-equiv "%(http_equiv)s" directive. To '
+        'cache you need to use the HTTP headers or Appcache with a manifest '
+        'file'),
+}
+_HTTP_EQUIV_MESSAGES['expires'] = _HTTP_EQUIV_MESSAGES['pragma']
 
 
 class HTTPEquivMessage(Message):
+    __slots__ = ()
+
     category = 'HTTP Equiv'
     description = 'HTML5 restricts the values of http-equiv'
     url = 'http://www.w3.org/TR/html5/document-metadata.html#pragma-directives'
@@ -341,41 +489,51 @@ class HTTPEquivMessage(Message):
     def __init__(self, line, column, http_equiv):
         Message.__init__(self, line, column)
         http_equiv = http_equiv.lower()
-        if http_equiv == 'content-language':
-            self.message = 'Specify the language in the html tag, see '
-            self.message += 'http://www.w3.org/International/questions/qa-http-and-lang.en#answer'
-        elif http_equiv == 'content-type':
-            self.message = 'Replace this by <meta charset="utf-8">'
-        elif http_equiv == 'set-cookie':
-            self.message = ('The http-equiv "%s" directive is non conformant,' +
-                            ' avoid it') % http_equiv
-        elif http_equiv in ('pragma', 'expires'):
-            self.message = (
-                'HTML5 does not allow the http-equiv "%s" directive. To cache' +
-                ' you need to use the HTTP headers or Appcache with a ' +
-                'manifest file') % http_equiv
-        else:
-            self.message = ('HTML5 does not allow the http-equiv "%s" ' +
-                            'directive') % http_equiv
+        self._fmt = _HTTP_EQUIV_MESSAGES.get(
+            http_equiv,
+            'HTML5 does not allow the http-equiv "%(http_equiv)s" directive')
+        self._args = {'http_equiv': http_equiv}
 
 
 class ExtraWhitespaceMessage(Message):
+    __slots__ = ()
+
     category = 'Extra whitespace'
     description = 'Use whitespaces only where expected and be consistent'
 
     def __init__(self, line, column):
         Message.__init__(self, line, column)
-        self.message = 'Remove the extra whitespaces'
+        self._fmt = 'Remove the extra whitespaces'
 
 
 # pylint: enable=too-few-public-methods,missing-docstring
 
 
-TRAILING_WHITESPACE_PATTERN = re.compile(r'([\t ]+)[\r\n]')
-TAB_PATTERN = re.compile(r'\t+')
-SELF_CLOSING_TAG_PATTERN = re.compile('([\t ]*/)>')
-VOID_ZERO_PATTERN = re.compile(r'^javascript:\s*void\s*\(\s*0\s*\)\s*;?$',
-                               flags=re.IGNORECASE)
+# Bounds the memory used to remember the messages of repeated start tags.
+_MAX_CACHED_STARTTAGS = 4096
+
+# The characters matched by \s in the regular expressions of HTMLParser.
+ATTRIBUTE_WHITESPACE = ' \t\n\r\f\v'
+
+# Python 3 matches str patterns with unicode semantics unless told otherwise.
+# Python 2 has no such flag, its patterns already work on ASCII only.
+_RE_ASCII = getattr(re, 'ASCII', 0)
+
+LINE_BREAK_PATTERN = re.compile(r'\r\n?|\n', flags=_RE_ASCII)
+SELF_CLOSING_TAG_PATTERN = re.compile('([\t ]*/)>', flags=_RE_ASCII)
+TAG_WHITESPACE_PATTERN = re.compile(
+    r'</?(?P<start>\s*)\w+(.*?)(\s*/|(?P<end>\s*))>',
+    flags=re.DOTALL)
+ATTRIBUTE_WHITESPACE_PATTERN = re.compile(
+    r'([\n\r]\s*|\s)(?P<before_attr>\s*)\w+' +
+    r'((?P<after_attr>\s*)=(?P<before_value>\s*))?',
+    flags=re.MULTILINE | re.DOTALL)
+# Copy of HTMLParser.attrfind from Python 2, which newer Python 3 versions no
+# longer provide.
+ATTRIBUTE_PATTERN = re.compile(
+    r'((?<=[\'"\s/])[^\s/>][^\s/=>]*)(\s*=+\s*' +
+    r'(\'[^\']*\'|"[^"]*"|(?![\'"])[^>\s]*))?(?:\s|/(?!>))*',
+    flags=_RE_ASCII)
 
 VOID_TAGS = frozenset((
     'br', 'hr', 'img', 'input', 'link', 'meta', 'area', 'base', 'col',
@@ -422,34 +580,136 @@ BOOLEAN_ATTRIBUTES = frozenset((
     'scoped', 'seamless', 'selected', 'sortable', 'spellcheck', 'translate',
     'truespeed', 'typemustmatch', 'visible'))
 
+# The characters allowed in ids and in class lists.
+ID_CHARACTERS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789-')
+CLASS_CHARACTERS = ID_CHARACTERS | frozenset(' ')
+
 
-def get_line_column(data, line, column, position):
+def get_line_breaks(data):
+    """Returns the sorted positions of the line breaks in the string.
+
+    Only '\\n', '\\r' and '\\r\\n' are line breaks. Unlike with str.splitlines,
+    characters such as '\\x0c', '\\x85' or '\\u2028' do not start a new line. A
+    '\\r\\n' sequence counts as a single line break, located at the '\\r'.
+    """
+    return [match.start() for match in LINE_BREAK_PATTERN.finditer(data)]
+
+
+def get_line_column(data, line, column, position, line_breaks=None):
     """Returns the line and column of the given position in the string.
 
     Column is 1-based, that means, that the first character in a line has column
     equal to 1. A line with n character also has a n+1 column, which sits just
-    before the newline.
+    before the newline. The lines are delimited as in get_line_breaks.
 
     Args:
       data: the original string.
       line: the line at which the string starts.
       column: the column at which the string starts.
       position: the position within the string. It is 0-based.
+      line_breaks: optional list, as returned by get_line_breaks, with the line
+                   breaks of data. Precompute it when calling this function
+                   many times for the same string.
 
     Returns:
       A tuple (line, column) with the offset of the position.
     """
-    data = data[:position]
-    toks = data.splitlines()
-    if not toks or data[-1] in '\n\r':
-        toks.append('')
-    if len(toks) > 1:
-        return line + len(toks) - 1, 1 + len(toks[-1])
-    else:
+    if line_breaks is None:
+        # A single lookup does not pay for building the list: count the line
+        # breaks before the position and find the last one in place.
+        index = (data.count('\n', 0, position) +
+                 data.count('\r', 0, position) -
+                 data.count('\r\n', 0, position))
+        if not index:
+            return line, column + position
+        line_start = max(data.rfind('\n', 0, position),
+                         data.rfind('\r', 0, position)) + 1
+        return line + index, 1 + position - line_start
+
+    # Number of line breaks before the position.
+    index = bisect.bisect_left(line_breaks, position)
+    if not index:
         return line, column + position
 
+    line_start = line_breaks[index - 1] + 1
+    if line_start < position and data[line_start - 1:line_start + 1] == '\r\n':
+        line_start += 1
+    return line + index, 1 + position - line_start
+
+
+def has_only_characters(name, characters):
+    """Returns whether the name is made only of the given characters.
+
+    A single trailing newline is accepted as well.
+
+    Args:
+        name: the value of the attribute.
+        characters: a frozenset with the allowed characters.
+    """
+    if not name:
+        return True
+    if name[-1] == '\n':
+        name = name[:-1]
+    return characters.issuperset(name)
+
+
+def is_void_zero(url):
+    """Returns whether the url is javascript:void(0), ignoring case and spaces.
+
+    As with \\s and re.IGNORECASE in a regular expression without re.UNICODE,
+    only the ASCII whitespace and letters are ignored.
 
-def get_attribute_line_column(tag_definition, line, column, attribute):
+    Args:
+        url: the stripped value of the attribute.
+    """
+    # Some non-ASCII letters, like U+0130, lowercase to an ASCII one.
+    prefix = url[:len('javascript:')]
+    if prefix.lower() != 'javascript:' or max(prefix) >= '\x80':
+        return False
+    url = url[len('javascript:'):].lstrip(ATTRIBUTE_WHITESPACE)
+    keyword = url[:len('void')]
+    if keyword.lower() != 'void' or max(keyword) >= '\x80':
+        return False
+    if url.endswith(';'):
+        url = url[:-1]
+    return ''.join(char for char in url[len('void'):]
+                   if char not in ATTRIBUTE_WHITESPACE) == '(0)'
+
+
+def scan_attributes(tag_definition, start=1):
+    """Returns the attributes found in the definition of a tag.
+
+    Args:
+        tag_definition: str with the definition of the tag.
+        start: the position at which to start looking for attributes.
+
+    Return:
+       A list of (name, name_start, value, value_start) tuples, one per
+       attribute. value is the raw value, quotes included, and it is None when
+       the attribute has no value.
+    """
+    return [(match.group(1), match.start(1), match.group(3),
+             match.start(3) if match.group(3) is not None else None)
+            for match in ATTRIBUTE_PATTERN.finditer(tag_definition, start)]
+
+
+def get_attribute_index(attributes):
+    """Returns a dict with the attributes indexed by attribute name.
+
+    Args:
+        attributes: list of attributes as returned by scan_attributes.
+
+    Return:
+       A dict mapping each lowercased attribute name to its first occurrence.
+    """
+    index = {}
+    for attribute in attributes:
+        index.setdefault(attribute[0].lower(), attribute)
+    return index
+
+
+def get_attribute_line_column(tag_definition, line, column, attribute,
+                              attribute_index=None, line_breaks=None):
     """Returns the line and column of the provided attribute.
 
     Args:
@@ -457,18 +717,26 @@ def get_attribute_line_column(tag_definition, line, column, attribute):
         line: line where the tag starts.
         column: column where the tag starts (1-based).
         attribute: str representing the attribute to find.
+        attribute_index: optional dict, as returned by get_attribute_index, with
+                         the attributes of tag_definition.
+        line_breaks: optional list, as returned by get_line_breaks, with the
+                     line breaks of tag_definition.
 
     Return:
        A (line, column) tuple representing the position of the attribute.
     """
-    for match in HTMLParser.attrfind.finditer(tag_definition):
-        if match.group(1).lower() == attribute:
-            return get_line_column(tag_definition, line, column, match.start(1))
+    if attribute_index is None:
+        attribute_index = get_attribute_index(scan_attributes(tag_definition))
+    match = attribute_index.get(attribute)
+    assert match is not None, (
+        'Could not find the requested attribute %s' % attribute)
 
-    assert False, 'Could not find the requested attribute %s' % attribute
+    return get_line_column(tag_definition, line, column, match[1],
+                           line_breaks)
 
 
-def get_value_line_column(tag_definition, line, column, attribute):
+def get_value_line_column(tag_definition, line, column, attribute,
+                          attribute_index=None, line_breaks=None):
     """Returns the line and column of the value of the provided attribute.
 
     Args:
@@ -476,21 +744,28 @@ def get_value_line_column(tag_definition, line, column, attribute):
         line: line where the tag starts.
         column: column where the tag starts (1-based).
         attribute: str representing the attribute for which we want its value.
+        attribute_index: optional dict, as returned by get_attribute_index, with
+                         the attributes of tag_definition.
+        line_breaks: optional list, as returned by get_line_breaks, with the
+                     line breaks of tag_definition.
 
     Return:
        A (line, column) tuple representing the position of the value.
     """
-    for match in HTMLParser.attrfind.finditer(tag_definition):
-        if match.group(1).lower() == attribute:
-            if not match.group(3):
-                pos = match.end(1)
-            elif match.group(3)[0] in '"\'':
-                pos = match.start(3) + 1
-            else:
-                pos = match.start(3)
-            return get_line_column(tag_definition, line, column, pos)
-
-    assert False, 'Could not find the requested attribute %s' % attribute
+    if attribute_index is None:
+        attribute_index = get_attribute_index(scan_attributes(tag_definition))
+    match = attribute_index.get(attribute)
+    assert match is not None, (
+        'Could not find the requested attribute %s' % attribute)
+
+    name, name_start, value, value_start = match
+    if not value:
+        pos = name_start + len(name)
+    elif value[0] in '"\'':
+        pos = value_start + 1
+    else:
+        pos = value_start
+    return get_line_column(tag_definition, line, column, pos, line_breaks)
 
 
 # pylint: disable=too-many-public-methods
@@ -504,8 +779,15 @@ class HTML5Linter(HTMLParser.HTMLParser):
     It changes somewhat the the usage of the base class, as it will call feed
     and close directly in the constructor.
     """
+    # The start tag being processed is kept in attributes shared by the checks.
+    # pylint: disable=too-many-instance-attributes
     def __init__(self, html):
+        # Pending messages as (line, column, message class, arguments) tuples.
         self._messages = []
+        self._message_objects = None
+        # The parser emits most messages in order, so only sort when needed.
+        self._messages_sorted = True
+        self._last_message_position = (0, 0)
 
         # Variables used to get the indentation
         self._last_data = ''
@@ -519,6 +801,18 @@ class HTML5Linter(HTMLParser.HTMLParser):
 
         # Variables to extend the feature set of HTMLParser.
         self._endtag_text = None
+        # Like HTMLParser's own, it is kept until the next start tag.
+        self._starttag_text = None
+        # Messages of the single line start tags seen so far, indexed by their
+        # text, as (column offset, message class, arguments) tuples.
+        self._starttag_messages = {}
+
+        # Attributes of the start tag being processed, so they are only
+        # scanned once per tag.
+        self._starttag_position = None
+        self._attributes = None
+        self._attribute_index = None
+        self._starttag_line_breaks = None
 
         HTMLParser.HTMLParser.__init__(self)
 
@@ -532,8 +826,65 @@ class HTML5Linter(HTMLParser.HTMLParser):
     @property
     def messages(self):
         """Returns a sorted list of the found messages."""
-        self._messages.sort(key=lambda m: (m.line, m.column))
-        return self._messages
+        if self._message_objects is None:
+            self._message_objects = self.get_messages()
+        return self._message_objects
+
+    def get_messages(self, exclude=()):
+        """Returns a sorted list of the found messages.
+
+        Args:
+          exclude: optional iterable with the Message classes to be ommited.
+                   The omitted messages are never built.
+        """
+        if not self._messages_sorted:
+            self._messages.sort(key=operator.itemgetter(0, 1))
+            self._messages_sorted = True
+            self._last_message_position = self._messages[-1][:2]
+
+        exclude = tuple(exclude)
+        excluded_classes = frozenset()
+        if exclude:
+            # There are only a few distinct message classes, so resolve the
+            # subclass checks once per class instead of once per message.
+            message_classes = set(record[2] for record in self._messages)
+            excluded_classes = frozenset(
+                message_class for message_class in message_classes
+                if issubclass(message_class, exclude))
+
+        return [message_class(line, column, **kwargs)
+                for line, column, message_class, kwargs in self._messages
+                if message_class not in excluded_classes]
+
+    def _add_message(self, message_class, line, column, **kwargs):
+        """Adds a message, keeping track of whether they are still sorted.
+
+        The message itself is only built when requested, so only its class and
+        arguments are stored.
+        """
+        position = line, column
+        if position < self._last_message_position:
+            self._messages_sorted = False
+        else:
+            self._last_message_position = position
+        self._messages.append((line, column, message_class, kwargs))
+        self._message_objects = None
+
+    def _extend_messages(self, records):
+        """Adds several messages at once.
+
+        Args:
+          records: list of (line, column, message class, arguments) tuples,
+                   sorted by position.
+        """
+        if not records:
+            return
+        if records[0][:2] < self._last_message_position:
+            self._messages_sorted = False
+        self._last_message_position = max(self._last_message_position,
+                                          records[-1][:2])
+        self._messages.extend(records)
+        self._message_objects = None
 
     def getline(self):
         """Returns the current line of the parser."""
@@ -548,101 +899,172 @@ class HTML5Linter(HTMLParser.HTMLParser):
 
         It only makes sense to call this method within an opening tag.
         """
-        return get_attribute_line_column(self.get_starttag_text(),
-                                         self.getline(),
-                                         self.getcolumn(),
-                                         attribute)
+        line, column = self._starttag_position
+        return get_attribute_line_column(self._starttag_text,
+                                         line,
+                                         column,
+                                         attribute,
+                                         self._get_attribute_index(),
+                                         self._starttag_line_breaks)
 
     def get_value_line_column(self, attribute):
         """Returns the line and column of the value of the attribute.
 
         It only makes sense to call this method within an opening tag.
         """
-        return get_value_line_column(self.get_starttag_text(),
-                                     self.getline(),
-                                     self.getcolumn(),
-                                     attribute)
+        line, column = self._starttag_position
+        return get_value_line_column(self._starttag_text,
+                                     line,
+                                     column,
+                                     attribute,
+                                     self._get_attribute_index(),
+                                     self._starttag_line_breaks)
+
+    def _get_attribute_index(self):
+        # Most tags do not need it, so it is only built on the first lookup.
+        if self._attribute_index is None:
+            self._attribute_index = get_attribute_index(self._attributes)
+        return self._attribute_index
 
     def handle_decl(self, decl):
         if decl.strip() != 'DOCTYPE html':
-            self._messages.append(
-                DocumentTypeMessage(line=self.getline(),
-                                    column=self.getcolumn(),
-                                    declaration='<!%s>' % decl))
+            self._add_message(DocumentTypeMessage,
+                              line=self.getline(),
+                              column=self.getcolumn(),
+                              declaration='<!%s>' % decl)
 
     def handle_entityref(self, name):
         if name not in VALID_ENTITIES:
             entity = '&%s;' % name
-            self._messages.append(
-                EntityReferenceMessage(line=self.getline(),
-                                       column=self.getcolumn(),
-                                       entity=entity))
+            self._add_message(EntityReferenceMessage,
+                              line=self.getline(),
+                              column=self.getcolumn(),
+                              entity=entity)
 
     def handle_charref(self, name):
         entity = '&#%s;' % name
-        self._messages.append(
-            EntityReferenceMessage(line=self.getline(),
-                                   column=self.getcolumn(),
-                                   entity=entity))
+        self._add_message(EntityReferenceMessage,
+                          line=self.getline(),
+                          column=self.getcolumn(),
+                          entity=entity)
 
     def handle_data(self, data):
         self._last_data = data
-        self._last_data_position = self.getline(), self.getcolumn()
-        for match in TRAILING_WHITESPACE_PATTERN.finditer(data):
-            line, column = get_line_column(
-                data, self.getline(), self.getcolumn(), match.start())
-            self._messages.append(
-                TrailingWhitespaceMessage(line=line,
-                                          column=column,
-                                          whitespace=match.group(1)))
-
-        for match in TAB_PATTERN.finditer(data):
-            line, column = get_line_column(
-                data, self.getline(), self.getcolumn(), match.start())
-            self._messages.append(TabMessage(line=line, column=column))
-
-    def handle_starttag(self, tag, attrs):
-        attrs = dict(attrs)
-        if getattr(self, '_handle_%s_starttag' % tag, None):
-            getattr(self, '_handle_%s_starttag' % tag)(attrs)
+        data_line, data_column = self.getline(), self.getcolumn()
+        self._last_data_position = data_line, data_column
+        line_breaks = get_line_breaks(data)
+        offset = 0
+        for text_line in data.splitlines(True):
+            content = text_line.rstrip('\r\n')
+            # Whitespace is only trailing if it is followed by a line break.
+            whitespace = content[len(content.rstrip('\t ')):]
+            if whitespace and len(content) < len(text_line):
+                line, column = get_line_column(
+                    data, data_line, data_column,
+                    offset + len(content) - len(whitespace), line_breaks)
+                self._add_message(TrailingWhitespaceMessage,
+                                  line=line,
+                                  column=column,
+                                  whitespace=whitespace)
+
+            # Report each run of tabs once.
+            tab = content.find('\t')
+            while tab >= 0:
+                line, column = get_line_column(
+                    data, data_line, data_column, offset + tab, line_breaks)
+                self._add_message(TabMessage, line=line, column=column)
+                while tab < len(content) and content[tab] == '\t':
+                    tab += 1
+                tab = content.find('\t', tab)
 
-        self._handle_style_attribute(tag, attrs)
-        self._handle_on_attributes(tag, attrs)
-        self._handle_href_src_attributes(tag, attrs)
-        self._handle_id_attribute(tag, attrs)
-        self._handle_class_attribute(tag, attrs)
+            offset += len(text_line)
 
-        self._check_optional_opening_tag(tag, attrs)
-        self._check_starttag_capitalization(tag)
-        self._check_attributes_case_quotation_entities(tag, attrs)
-
-        self._check_boolean_attributes(attrs)
+    def handle_starttag(self, tag, attrs):
+        self._starttag_text = starttag_text = self.get_starttag_text()
+        self._starttag_position = line, column = (self.getline(),
+                                                  self.getcolumn())
+
+        # Within a tag written on a single line, the messages only depend on
+        # the text of the tag, so repeated tags just replay them at their own
+        # column.
+        cacheable = (tag not in HTML5Linter._UNCACHED_STARTTAGS and
+                     '\n' not in starttag_text and '\r' not in starttag_text)
+        cached_messages = None
+        if cacheable:
+            cached_messages = self._starttag_messages.get(starttag_text)
+        if cached_messages is not None:
+            self._extend_messages([
+                (line, column + offset, message_class, kwargs)
+                for offset, message_class, kwargs in cached_messages])
+        else:
+            first_message = len(self._messages)
+            self._check_starttag(tag, attrs)
+            if (cacheable and
+                    len(self._starttag_messages) < _MAX_CACHED_STARTTAGS):
+                # Sorted, so a replay only needs to check its first message.
+                self._starttag_messages[starttag_text] = sorted(
+                    [(message_column - column, message_class, kwargs)
+                     for _, message_column, message_class, kwargs
+                     in self._messages[first_message:]],
+                    key=operator.itemgetter(0))
 
         self._check_tags_in_newline(tag)
         # This needs to be after as it erases self._last_data, which is needed
         # to get the indentation.
         self._check_indentation()
-        self._check_whitespaces(opening=True)
 
         # Reset the _end_tag text, so to prevent to consider a self closing tag
         # as a closing one.
         self._endtag_text = None
+        # The attributes are only valid while processing this tag.
+        self._starttag_position = None
+        self._attributes = None
+        self._attribute_index = None
+        self._starttag_line_breaks = None
+
+    def _check_starttag(self, tag, attrs):
+        """Runs the checks that only depend on the text of the start tag."""
+        # Most tags have no attributes at all.
+        if not attrs:
+            attrs = {}
+        else:
+            attrs = dict(attrs)
+        starttag_text = self._starttag_text
+        self._attributes = scan_attributes(starttag_text)
+        self._attribute_index = None
+        self._starttag_line_breaks = get_line_breaks(starttag_text)
+
+        handler = HTML5Linter._STARTTAG_HANDLERS.get(tag)
+        if handler is not None:
+            getattr(self, handler)(attrs)
+
+        self._handle_attributes(tag, attrs)
+
+        self._check_optional_opening_tag(tag, attrs)
+        self._check_starttag_capitalization(tag)
+        self._check_attributes_case_quotation_entities(tag, attrs)
+
+        self._check_boolean_attributes(attrs)
+
+        self._check_whitespaces(opening=True)
 
     def _handle_head_starttag(self, unused_attrs):
+        starttag_text = self._starttag_text
+        line, column = self._starttag_position
         self._after_head_line_col = get_line_column(
-            self.get_starttag_text(), self.getline(), self.getcolumn(),
-            len(self.get_starttag_text()))
+            starttag_text, line, column, len(starttag_text),
+            self._starttag_line_breaks)
 
     def _handle_meta_starttag(self, attrs):
-        if not self._first_meta_line_col:
-            self._first_meta_line_col = self.getline(), self.getcolumn()
+        if self._first_meta_line_col is None:
+            self._first_meta_line_col = self._starttag_position
 
         if attrs.get('http-equiv', '').lower() not in VALID_HTTP_EQUIV:
             line, column = self.get_attribute_line_column('http-equiv')
-            self._messages.append(
-                HTTPEquivMessage(line=line,
-                                 column=column,
-                                 http_equiv=attrs['http-equiv']))
+            self._add_message(HTTPEquivMessage,
+                              line=line,
+                              column=column,
+                              http_equiv=attrs['http-equiv'])
 
         if 'charset' not in attrs:
             return
@@ -650,202 +1072,256 @@ class HTML5Linter(HTMLParser.HTMLParser):
         self._has_charset = True
         if attrs['charset'] != 'utf-8':
             line, column = self.get_value_line_column('charset')
-            self._messages.append(
-                CharsetMessage(line=line,
-                               column=column,
-                               charset=attrs['charset']))
+            self._add_message(CharsetMessage,
+                              line=line,
+                              column=column,
+                              charset=attrs['charset'])
 
     def _handle_link_starttag(self, attrs):
         if attrs.get('type') == 'text/css':
             line, column = self.get_attribute_line_column('type')
-            self._messages.append(
-                TypeAttributeMessage(line=line, column=column, tag='link'))
+            self._add_message(TypeAttributeMessage,
+                              line=line,
+                              column=column,
+                              tag='link')
 
     def _handle_script_starttag(self, attrs):
         if attrs.get('type') == 'text/javascript':
             line, column = self.get_attribute_line_column('type')
-            self._messages.append(
-                TypeAttributeMessage(line=line, column=column, tag='script'))
+            self._add_message(TypeAttributeMessage,
+                              line=line,
+                              column=column,
+                              tag='script')
         if 'src' not in attrs:
-            self._messages.append(
-                ConcernsSeparationMessage(line=self.getline(),
-                                          column=self.getcolumn(),
-                                          tag='script'))
+            self._add_message(ConcernsSeparationMessage,
+                              line=self.getline(),
+                              column=self.getcolumn(),
+                              tag='script')
             if 'charset' in attrs:
                 line, column = self.get_attribute_line_column('charset')
-                self._messages.append(
-                    InvalidAttributeMessage(line=line,
-                                            column=column,
-                                            attribute='charset'))
+                self._add_message(InvalidAttributeMessage,
+                                  line=line,
+                                  column=column,
+                                  attribute='charset')
         if 'language' in attrs:
             line, column = self.get_attribute_line_column('language')
-            self._messages.append(
-                InvalidAttributeMessage(line=line,
-                                        column=column,
-                                        attribute='language'))
+            self._add_message(InvalidAttributeMessage,
+                              line=line,
+                              column=column,
+                              attribute='language')
 
     def _handle_style_starttag(self, attrs):
-        self._messages.append(
-            ConcernsSeparationMessage(line=self.getline(),
-                                      column=self.getcolumn(),
-                                      tag='style'))
+        self._add_message(ConcernsSeparationMessage,
+                          line=self.getline(),
+                          column=self.getcolumn(),
+                          tag='style')
         if attrs.get('type') == 'text/css':
             line, column = self.get_attribute_line_column('type')
-            self._messages.append(
-                TypeAttributeMessage(line=line, column=column, tag='style'))
+            self._add_message(TypeAttributeMessage,
+                              line=line,
+                              column=column,
+                              tag='style')
 
     def _handle_a_starttag(self, attrs):
-        if VOID_ZERO_PATTERN.match(attrs.get('href', '').strip()):
-            line, column = self.get_value_line_column('href')
-            self._messages.append(
-                VoidZeroMessage(line=line, column=column))
-        elif attrs.get('href', '').strip().lower().startswith('javascript:'):
+        href = attrs.get('href')
+        if href:
+            href = href.strip()
+        # Only the protocol needs to be lowercased to tell these links apart.
+        if href and href[:len('javascript:')].lower() == 'javascript:':
             line, column = self.get_value_line_column('href')
-            self._messages.append(
-                ConcernsSeparationMessage(line=line,
-                                          column=column,
-                                          tag='a',
-                                          attribute='href'))
+            if is_void_zero(href):
+                self._add_message(VoidZeroMessage, line=line, column=column)
+            else:
+                self._add_message(ConcernsSeparationMessage,
+                                  line=line,
+                                  column=column,
+                                  tag='a',
+                                  attribute='href')
         if 'name' in attrs:
             line, column = self.get_attribute_line_column('name')
-            self._messages.append(
-                InvalidAttributeMessage(line=line,
-                                        column=column,
-                                        attribute='name'))
-
-    def _handle_style_attribute(self, tag, attrs):
-        if 'style' in attrs:
-            line, column = self.get_attribute_line_column('style')
-            self._messages.append(
-                ConcernsSeparationMessage(line=line,
-                                          column=column,
-                                          tag=tag,
-                                          attribute='style'))
-
-    def _handle_on_attributes(self, tag, attrs):
-        for attr in attrs:
-            if attr.lower().startswith('on'):
-                line, column = self.get_attribute_line_column(attr)
-                self._messages.append(
-                    ConcernsSeparationMessage(line=line,
-                                              column=column,
-                                              tag=tag,
-                                              attribute=attr))
-
-                if attrs[attr].strip().lower().startswith('javascript:'):
-                    line, column = self.get_value_line_column(attr)
-                    self._messages.append(
-                        InvalidHandlerMessage(line=line,
-                                              column=column,
-                                              attribute=attr))
-
-    def _handle_href_src_attributes(self, unused_tag, attrs):
-        attr = None
-        if 'src' in attrs:
-            attr = 'src'
-        elif 'href' in attrs:
-            attr = 'href'
-        url = attrs.get(attr, '')
-        match = re.match(r'^(http[s]?:)', url)
-        if not match:
+            self._add_message(InvalidAttributeMessage,
+                              line=line,
+                              column=column,
+                              attribute='name')
+
+    # Names of the handlers for the tags requiring specific checks, indexed by
+    # tag name. They are looked up on the instance, so subclasses can override
+    # them.
+    _STARTTAG_HANDLERS = {
+        'head': '_handle_head_starttag',
+        'meta': '_handle_meta_starttag',
+        'link': '_handle_link_starttag',
+        'script': '_handle_script_starttag',
+        'style': '_handle_style_starttag',
+        'a': '_handle_a_starttag',
+    }
+    # Their handlers also update the state of the linter, so their messages
+    # can not be replayed.
+    _UNCACHED_STARTTAGS = frozenset(('head', 'meta'))
+
+    def _handle_attributes(self, tag, attrs):
+        # HTMLParser already lowercases the attribute names.
+        for attr, value in attrs.items():
+            if attr.startswith('on'):
+                self._handle_on_attribute(tag, attr, value)
+            elif attr == 'style':
+                self._handle_style_attribute(tag)
+            elif attr == 'id':
+                self._handle_id_attribute(value)
+            elif attr == 'class':
+                self._handle_class_attribute(value)
+            elif attr == 'src' or (attr == 'href' and 'src' not in attrs):
+                self._handle_href_src_attribute(attr, value)
+
+    def _handle_style_attribute(self, tag):
+        line, column = self.get_attribute_line_column('style')
+        self._add_message(ConcernsSeparationMessage,
+                          line=line,
+                          column=column,
+                          tag=tag,
+                          attribute='style')
+
+    def _handle_on_attribute(self, tag, attr, value):
+        line, column = self.get_attribute_line_column(attr)
+        self._add_message(ConcernsSeparationMessage,
+                          line=line,
+                          column=column,
+                          tag=tag,
+                          attribute=attr)
+
+        # Handler bodies can be long, so only lowercase the protocol.
+        if (value and
+                value.lstrip()[:len('javascript:')].lower() == 'javascript:'):
+            line, column = self.get_value_line_column(attr)
+            self._add_message(InvalidHandlerMessage,
+                              line=line,
+                              column=column,
+                              attribute=attr)
+
+    def _handle_href_src_attribute(self, attr, url):
+        # Attributes without a value, as in <a href>, have None as url.
+        if not url:
+            return
+
+        if url.startswith('http:'):
+            protocol = 'http:'
+        elif url.startswith('https:'):
+            protocol = 'https:'
+        else:
             return
 
-        protocol = match.group(0)
         line, column = self.get_value_line_column(attr)
-        self._messages.append(
-            ProtocolMessage(line=line,
-                            column=column,
-                            protocol=protocol))
-
-    def _handle_id_attribute(self, unused_tag, attrs):
-        name = attrs.get('id', '')
-        if not re.match(r'^[a-z0-9-]*$', name):
+        self._add_message(ProtocolMessage,
+                          line=line,
+                          column=column,
+                          protocol=protocol)
+
+    def _handle_id_attribute(self, name):
+        if not has_only_characters(name, ID_CHARACTERS):
             line, column = self.get_value_line_column('id')
-            self._messages.append(
-                NameMessage(line=line,
-                            column=column,
-                            attribute='id',
-                            value=name))
-
-    def _handle_class_attribute(self, unused_tag, attrs):
-        name = attrs.get('class', '')
-        if not re.match(r'^[a-z0-9 -]*$', name):
+            self._add_message(NameMessage,
+                              line=line,
+                              column=column,
+                              attribute='id',
+                              value=name)
+
+    def _handle_class_attribute(self, name):
+        if not has_only_characters(name, CLASS_CHARACTERS):
             line, column = self.get_value_line_column('class')
-            self._messages.append(
-                NameMessage(line=line,
-                            column=column,
-                            attribute='class',
-                            value=name))
+            self._add_message(NameMessage,
+                              line=line,
+                              column=column,
+                              attribute='class',
+                              value=name)
 
     def _check_optional_opening_tag(self, tag, attrs):
         if tag in OPTIONAL_OPENING_TAGS and not attrs:
-            self._messages.append(
-                OptionalTagMessage(line=self.getline(),
-                                   column=self.getcolumn(),
-                                   tag=tag,
-                                   opening=True))
+            self._add_message(OptionalTagMessage,
+                              line=self.getline(),
+                              column=self.getcolumn(),
+                              tag=tag,
+                              opening=True)
 
     def _check_starttag_capitalization(self, tag):
-        original_def = self.get_starttag_text()
+        original_def = self._starttag_text
         original_tag = original_def[1:len(tag) + 1]
         # We do not use islower() due to http://bugs.python.org/issue13822.
         if original_tag != original_tag.lower():
-            self._messages.append(
-                CapitalizationMessage(line=self.getline(),
-                                      column=self.getcolumn() + 1,
-                                      tag=original_tag))
+            self._add_message(CapitalizationMessage,
+                              line=self.getline(),
+                              column=self.getcolumn() + 1,
+                              tag=original_tag)
 
     def _check_attributes_case_quotation_entities(self, tag, unused_attrs):
-        original_def = self.get_starttag_text()
-        for match in HTMLParser.attrfind.finditer(original_def, len(tag) + 1):
+        # Most tags have no attributes, there is nothing to check then.
+        if not self._attributes:
+            return
+
+        original_def = self._starttag_text
+        tag_line, tag_column = self._starttag_position
+        line_breaks = self._starttag_line_breaks
+        attributes = self._attributes
+        # Only the attributes after the tag name are checked. A quote in the tag
+        # name makes the scanner find an attribute inside of it, and that one
+        # may swallow the first attribute, so the definition is scanned again.
+        if attributes[0][1] <= len(tag):
+            attributes = scan_attributes(original_def, len(tag) + 1)
+        for name, _, value, value_start in attributes:
             # We do not use islower() due to http://bugs.python.org/issue13822.
-            if match.group(1) != match.group(1).lower():
-                line, column = self.get_attribute_line_column(
-                    match.group(1).lower())
-                self._messages.append(
-                    CapitalizationMessage(line=line,
-                                          column=column,
-                                          tag=tag,
-                                          attribute=match.group(1)))
-            if not match.group(3):
+            if name != name.lower():
+                line, column = self.get_attribute_line_column(name.lower())
+                self._add_message(CapitalizationMessage,
+                                  line=line,
+                                  column=column,
+                                  tag=tag,
+                                  attribute=name)
+            if not value:
                 continue
-            if not match.group(3).startswith('"'):
+            if not value.startswith('"'):
                 line, column = get_line_column(
-                    original_def, self.getline(), self.getcolumn(),
-                    match.start(3))
+                    original_def, tag_line, tag_column, value_start,
+                    line_breaks)
                 quotation = ''
-                if match.group(3).startswith('\''):
+                if value.startswith('\''):
                     quotation = '\''
-                self._messages.append(
-                    QuotationMessage(line=line,
-                                     column=column,
-                                     quotation=quotation))
+                self._add_message(QuotationMessage,
+                                  line=line,
+                                  column=column,
+                                  quotation=quotation)
+
+            # Most values have no entities at all, so skip scanning them.
+            if '&' in value:
+                self._check_attribute_entities(value, value_start)
+
+    def _check_attribute_entities(self, value, value_start):
+        original_def = self._starttag_text
+        tag_line, tag_column = self._starttag_position
+        line_breaks = self._starttag_line_breaks
+
+        # Notify ourselves of any entities found on the attributes
+        current_pos = self.getpos()
+        for entity_match in HTMLParser.entityref.finditer(value):
+            if not entity_match.group().endswith(';'):
+                continue
+            self.line, self.offset = get_line_column(
+                original_def, tag_line, tag_column,
+                entity_match.start(0) + value_start, line_breaks)
+            self.offset -= 1
+            self.handle_entityref(entity_match.group(1))
+
+        for entity_match in HTMLParser.charref.finditer(value):
+            if not entity_match.group().endswith(';'):
+                continue
+            self.line, self.offset = get_line_column(
+                original_def, tag_line, tag_column,
+                entity_match.start(0) + value_start, line_breaks)
+            self.offset -= 1
+            self.handle_charref(entity_match.group(0)[2:-1])
 
-            # Notify ourselves of any entities found on the attributes
-            current_pos = self.getpos()
-            line, column = self.getline(), self.getcolumn()
-            for entity_match in HTMLParser.entityref.finditer(match.group(3)):
-                if not entity_match.group().endswith(';'):
-                    continue
-                self.line, self.offset = get_line_column(
-                    original_def, line, column,
-                    entity_match.start(0) + match.start(3))
-                self.offset -= 1
-                self.handle_entityref(entity_match.group(1))
-
-            for entity_match in HTMLParser.charref.finditer(match.group(3)):
-                if not entity_match.group().endswith(';'):
-                    continue
-                self.line, self.offset = get_line_column(
-                    original_def, line, column,
-                    entity_match.start(0) + match.start(3))
-                self.offset -= 1
-                self.handle_charref(entity_match.group(0)[2:-1])
-
-            # Line is defined in the base class.
-            # pylint: disable=attribute-defined-outside-init
-            self.line, self.offset = current_pos
-            # pylint: enable=attribute-defined-outside-init
+        # Line is defined in the base class.
+        # pylint: disable=attribute-defined-outside-init
+        self.line, self.offset = current_pos
+        # pylint: enable=attribute-defined-outside-init
 
     def handle_endtag(self, tag):
         self._check_endtag_capitalization()
@@ -856,21 +1332,24 @@ class HTML5Linter(HTMLParser.HTMLParser):
         if tag in VOID_TAGS:
             trailing_chars = None
             line, column = self.getline(), self.getcolumn()
-            match = SELF_CLOSING_TAG_PATTERN.search(self.get_starttag_text())
+            # HTMLParser calls handle_endtag right after handle_starttag for
+            # self closing tags, so this is still the text of the void tag.
+            starttag_text = self._starttag_text
+            match = SELF_CLOSING_TAG_PATTERN.search(starttag_text)
             if match:
                 trailing_chars = match.group(1)
                 line, column = get_line_column(
-                    self.get_starttag_text(), line, column, match.start(1))
-            self._messages.append(
-                VoidElementMessage(line=line,
-                                   column=column,
-                                   tag=tag,
-                                   trailing_chars=trailing_chars))
+                    starttag_text, line, column, match.start(1))
+            self._add_message(VoidElementMessage,
+                              line=line,
+                              column=column,
+                              tag=tag,
+                              trailing_chars=trailing_chars)
         elif tag in OPTIONAL_CLOSING_TAGS:
-            self._messages.append(
-                OptionalTagMessage(line=self.getline(),
-                                   column=self.getcolumn(),
-                                   tag=tag))
+            self._add_message(OptionalTagMessage,
+                              line=self.getline(),
+                              column=self.getcolumn(),
+                              tag=tag)
 
     def _check_endtag_capitalization(self):
         endtag = self.get_endtag_text()
@@ -878,18 +1357,18 @@ class HTML5Linter(HTMLParser.HTMLParser):
         if endtag and endtag != endtag.lower():
             match = HTMLParser.endtagfind.match(endtag)  # </ + tag + >
             original_endtag = match.group(1)
-            self._messages.append(
-                CapitalizationMessage(line=self.getline(),
-                                      column=self.getcolumn() + 2,
-                                      tag=original_endtag,
-                                      closing=True))
+            self._add_message(CapitalizationMessage,
+                              line=self.getline(),
+                              column=self.getcolumn() + 2,
+                              tag=original_endtag,
+                              closing=True)
 
     def close(self):
         if (not self._has_charset and
                 (self._first_meta_line_col or self._after_head_line_col)):
             line, column = (self._first_meta_line_col or
                             self._after_head_line_col)
-            self._messages.append(CharsetMessage(line=line, column=column))
+            self._add_message(CharsetMessage, line=line, column=column)
 
     def _check_indentation(self):
         indentation = self._get_indentation()
@@ -899,15 +1378,17 @@ class HTML5Linter(HTMLParser.HTMLParser):
         # Argg, given that we don't implement the opening and closing tags
         # HTML5 logic, we need to allow any indentation that is multiple of two
         # between 0 and last_indent + 2. This is to prevent false positives.
-        if indentation not in range(self._last_indent + 2, -1, -2):
-            self._messages.append(
-                IndentationMessage(line=self.getline(),
-                                   column=1,
-                                   indent=indentation,
-                                   max_indent=self._last_indent + 2))
+        max_indent = self._last_indent + 2
+        if (not 0 <= indentation <= max_indent or
+                (max_indent - indentation) % 2):
+            self._add_message(IndentationMessage,
+                              line=self.getline(),
+                              column=1,
+                              indent=indentation,
+                              max_indent=max_indent)
             # Normalize the indentation, so to minimize subsequent indents.
-            if indentation > self._last_indent + 2:
-                indentation = self._last_indent + 2
+            if indentation > max_indent:
+                indentation = max_indent
             elif indentation > self._last_indent:
                 indentation += 1
             else:
@@ -918,56 +1399,56 @@ class HTML5Linter(HTMLParser.HTMLParser):
 
     def _check_tags_in_newline(self, tag):
         if tag in NEWLINE_TAGS and self._get_indentation() is None:
-            self._messages.append(
-                FormattingMessage(line=self.getline(),
-                                  column=self.getcolumn(),
-                                  tag=tag))
+            self._add_message(FormattingMessage,
+                              line=self.getline(),
+                              column=self.getcolumn(),
+                              tag=tag)
 
     def _check_boolean_attributes(self, attrs):
-        for attr, value in attrs.items():
-            if attr in BOOLEAN_ATTRIBUTES and value is not None:
+        for attr in BOOLEAN_ATTRIBUTES.intersection(attrs):
+            value = attrs[attr]
+            if value is not None:
                 line, column = self.get_attribute_line_column(attr)
-                self._messages.append(
-                    BooleanAttributeMessage(line=line,
-                                            column=column,
-                                            attribute=attr,
-                                            value=value))
+                self._add_message(BooleanAttributeMessage,
+                                  line=line,
+                                  column=column,
+                                  attribute=attr,
+                                  value=value)
 
     def _check_whitespaces(self, opening):
-        tag_pattern = re.compile(
-            r'</?(?P<start>\s*)\w+(.*?)(\s*/|(?P<end>\s*))>',
-            flags=re.DOTALL)
-        attribute_pattern = re.compile(
-            r'([\n\r]\s*|\s)(?P<before_attr>\s*)\w+' +
-            r'((?P<after_attr>\s*)=(?P<before_value>\s*))?',
-            flags=re.MULTILINE | re.DOTALL)
         if opening:
-            original_def = self.get_starttag_text()
+            original_def = self._starttag_text
+            tag_line, tag_column = self._starttag_position
+            line_breaks = self._starttag_line_breaks
         else:
             original_def = self.get_endtag_text()
+            tag_line, tag_column = self.getline(), self.getcolumn()
+            line_breaks = None
         if original_def is None:
             return
 
-        match = tag_pattern.match(original_def)
+        match = TAG_WHITESPACE_PATTERN.match(original_def)
         assert match is not None, 'the regular expression is invalid'
 
         for group_name in ('start', 'end'):
             if match.group(group_name):
                 line, column = get_line_column(
-                    original_def, self.getline(), self.getcolumn(),
-                    match.start(group_name))
-                self._messages.append(
-                    ExtraWhitespaceMessage(line=line, column=column))
-
-        for attr_match in attribute_pattern.finditer(original_def,
-                                                     match.start(2)):
+                    original_def, tag_line, tag_column,
+                    match.start(group_name), line_breaks)
+                self._add_message(ExtraWhitespaceMessage,
+                                  line=line,
+                                  column=column)
+
+        for attr_match in ATTRIBUTE_WHITESPACE_PATTERN.finditer(
+                original_def, match.start(2)):
             for group_name in ('before_attr', 'after_attr', 'before_value'):
                 if attr_match.group(group_name):
                     line, column = get_line_column(
-                        original_def, self.getline(), self.getcolumn(),
-                        attr_match.start(group_name))
-                    self._messages.append(
-                        ExtraWhitespaceMessage(line=line, column=column))
+                        original_def, tag_line, tag_column,
+                        attr_match.start(group_name), line_breaks)
+                    self._add_message(ExtraWhitespaceMessage,
+                                      line=line,
+                                      column=column)
 
     # Overrides to support extra functions
     def parse_endtag(self, i):
@@ -995,19 +1476,16 @@ class HTML5Linter(HTMLParser.HTMLParser):
         if self._last_data is None:
             return None
 
-        toks = self._last_data.splitlines()
-        # This is required to actually get the content of all the lines.
-        # The self._last_data[-1] is guaranteed to be defined as toks is not
-        # empty.
-        if not toks or self._last_data[-1] in '\n\r':
-            toks.append('')
-        if len(toks) == 1 and self._last_data_position[1] != 1:
+        # Only the last line matters, there is no need to split them all.
+        data = self._last_data
+        line_start = max(data.rfind('\n'), data.rfind('\r')) + 1
+        # Without a line break the data must start at the beginning of a line.
+        if not line_start and self._last_data_position[1] != 1:
             return None
 
-        potential_indent = toks[-1].replace('\t', '  ')
-        indent = ' ' * len(potential_indent)
-        if indent == potential_indent:
-            return len(indent)
+        potential_indent = data[line_start:].replace('\t', '  ')
+        if potential_indent.count(' ') == len(potential_indent):
+            return len(potential_indent)
 
         return None
 
@@ -1021,6 +1499,5 @@ def lint(html, exclude=None):
                output.
     """
     exclude = exclude or []
-    messages = [m.__unicode__() for m in HTML5Linter(html).messages
-                if not isinstance(m, tuple(exclude))]
-    return '\n'.join(messages)
+    return '\n'.join(m.__unicode__()
+                     for m in HTML5Linter(html).get_messages(exclude))
@@ -47,7 +47,6 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import codecs
-import io
 import sys
 
 import docopt
@@ -79,6 +78,8 @@ _DISABLE_MAP = {
     'extra_whitespace': html_linter.ExtraWhitespaceMessage,
 }
 
+_VALID_DISABLE = frozenset(_DISABLE_MAP)
+
 
 __VERSION__ = '0.1'
 
@@ -95,17 +96,21 @@ def main():
                             version='html5_lint v%s' % __VERSION__)
 
     disable_str = options['--disable'] or ''
-    disable = disable_str.split(',')
+    disable = set(d for d in disable_str.split(',') if d)
 
-    invalid_disable = set(disable) - set(_DISABLE_MAP.keys()) - set(('',))
+    invalid_disable = disable - _VALID_DISABLE
     if invalid_disable:
         sys.stderr.write(
             'Invalid --disable arguments: %s\n\n' % ', '.join(invalid_disable))
         sys.stderr.write(__doc__)
         return 1
 
-    exclude = [_DISABLE_MAP[d] for d in disable if d in _DISABLE_MAP]
-    clean_html = template_remover.clean(io.open(options['FILENAME']).read())
+    exclude = [_DISABLE_MAP[d] for d in disable]
+    with open(options['FILENAME'], 'rb') as html_file:
+        html = html_file.read().decode('utf-8')
+    # HTMLParser only counts '\n' when computing the line numbers.
+    html = html.replace('\r\n', '\n').replace('\r', '\n')
+    clean_html = template_remover.clean(html)
     print(html_linter.lint(clean_html, exclude=exclude))
 
     return 0
@@ -12,7 +12,64 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import sys
+
 from setuptools import setup, find_packages
+from setuptools.command.build_ext import build_ext
+
+try:
+    # distutils is gone from Python 3.12, setuptools provides the same errors.
+    from setuptools.errors import (CCompilerError,
+                                   ExecError as DistutilsExecError,
+                                   PlatformError as DistutilsPlatformError)
+except ImportError:
+    from distutils.errors import (CCompilerError, DistutilsExecError,
+                                  DistutilsPlatformError)
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+
+def warn_pure_python():
+    """Warns that the pure Python version of html_linter is used."""
+    sys.stderr.write('WARNING: could not compile html_linter, falling ' +
+                     'back to the pure Python version.\n')
+
+
+class OptionalBuildExt(build_ext):
+    """Builds the extension modules, falling back to pure Python on failure.
+
+    The compiled module is just an accelerated version of html_linter.py, so
+    not having a C toolchain should never prevent the installation.
+    """
+
+    def run(self):
+        try:
+            build_ext.run(self)
+        except DistutilsPlatformError:
+            warn_pure_python()
+
+    def build_extension(self, ext):
+        try:
+            build_ext.build_extension(self, ext)
+        except (CCompilerError, DistutilsExecError, DistutilsPlatformError):
+            warn_pure_python()
+
+
+def get_ext_modules():
+    """Returns the extension modules to build when Cython is available."""
+    if cythonize is None:
+        return []
+    try:
+        return cythonize('html_linter.py',
+                         compiler_directives={'language_level': 3})
+    except Exception:  # pylint: disable=broad-except
+        # A broken Cython may fail in any way, but the pure Python version
+        # still works.
+        warn_pure_python()
+        return []
 
 
 setup(
@@ -26,6 +83,8 @@ setup(
     py_modules=['html_linter'],
     install_requires=['template-remover', 'docopt==0.6.1'],
     tests_require=['nose>=1.3'],
+    ext_modules=get_ext_modules(),
+    cmdclass={'build_ext': OptionalBuildExt},
     scripts=['scripts/html_lint.py'],
     classifiers=[
         'Development Status :: 3 - Alpha',
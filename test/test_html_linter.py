@@ -19,7 +19,6 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import io
 import os
 import unittest
 
@@ -28,546 +27,561 @@ import html_linter
 
 # pylint: disable=too-many-public-methods,protected-access
 
+# The tests do not share any state, so nose's multiprocess plugin can spread
+# them, and the methods of a same class, over several processes. nose looks
+# the flag up by this exact name.
+_multiprocess_can_split_ = True  # pylint: disable=invalid-name
+
+
+# The messages of each linted source, so every source is only linted once.
+_MESSAGES_CACHE = {}
+
+
+def _messages(html):
+    """Returns the messages of the given html, linting it only once."""
+    if html not in _MESSAGES_CACHE:
+        _MESSAGES_CACHE[html] = tuple(html_linter.HTML5Linter(html).messages)
+    return list(_MESSAGES_CACHE[html])
+
+
+# Entity and character references, in the text and in the attributes. They
+# must end with a semicolon.
+_REFERENCE_CASES = [
+    (' &aacute; ', [html_linter.EntityReferenceMessage(
+        1, 2, entity='&aacute;')]),
+    (' &lt; &gt; &nbsp; &amp; ', []),
+    ('<a href=" &aacute; ">', [html_linter.EntityReferenceMessage(
+        1, 11, entity='&aacute;')]),
+    ('<a href="&lt; &gt; &nbsp; &amp;">', []),
+    ('<a href="foo?foo=foo&bar=bar&baz=baz">', []),
+    ('<a href=" &aacute= ">', []),
+    (' &#32; ', [html_linter.EntityReferenceMessage(1, 2, entity='&#32;')]),
+    ('<a href=" &#32; ">', [html_linter.EntityReferenceMessage(
+        1, 11, entity='&#32;')]),
+    ('<a href=" &#32= ">', []),
+]
+
+# Sources and expected messages of the longer tests, built once.
+_SRC_FORMATTING = '<ul><li><div><table><tr><td>'
+_EXPECTED_FORMATTING = [
+    html_linter.FormattingMessage(1, 5, tag='li'),
+    html_linter.FormattingMessage(1, 9, tag='div'),
+    html_linter.FormattingMessage(1, 14, tag='table'),
+    html_linter.FormattingMessage(1, 21, tag='tr'),
+    html_linter.FormattingMessage(1, 25, tag='td'),
+]
+
+_SRC_HTTP_EQUIV = (
+    '<meta charset="utf-8">\n' +
+    '<meta http-equiv="content-type">\n' +
+    '<meta http-equiv="content-language">\n' +
+    '<meta http-equiv="pragma">\n' +
+    '<meta http-equiv="expires">\n' +
+    '<meta http-equiv="set-cookie">\n' +
+    '<meta http-equiv="foo">')
+_EXPECTED_HTTP_EQUIV = [
+    html_linter.HTTPEquivMessage(2, 7, http_equiv='content-type'),
+    html_linter.HTTPEquivMessage(3, 7, http_equiv='content-language'),
+    html_linter.HTTPEquivMessage(4, 7, http_equiv='pragma'),
+    html_linter.HTTPEquivMessage(5, 7, http_equiv='expires'),
+    html_linter.HTTPEquivMessage(6, 7, http_equiv='set-cookie'),
+    html_linter.HTTPEquivMessage(7, 7, http_equiv='foo'),
+]
+
+_SRC_VALID_HTTP_EQUIV = (
+    '<meta charset="utf-8">\n' +
+    '<meta http-equiv="refresh">\n' +
+    '<meta http-equiv="default-style">\n' +
+    '<meta http-equiv="x-ua-compatible">')
+
+_SRC_WHITESPACES = '<a   href = "foo" >Foo</ a ><br />'
+_EXPECTED_WHITESPACES = [
+    html_linter.ExtraWhitespaceMessage(1, 4),
+    html_linter.ExtraWhitespaceMessage(1, 10),
+    html_linter.ExtraWhitespaceMessage(1, 12),
+    html_linter.ExtraWhitespaceMessage(1, 18),
+    html_linter.ExtraWhitespaceMessage(1, 25),
+    html_linter.ExtraWhitespaceMessage(1, 27),
+    html_linter.VoidElementMessage(1, 32, tag='br', trailing_chars=' /'),
+]
+
 
 class TestHTML5Linter(unittest.TestCase):
+    # Show the failing source along with the differing messages.
+    longMessage = True
+
+    def assert_clean(self, html):
+        """Asserts that linting the html does not raise any message."""
+        messages = _messages(html)
+        self.assertFalse(messages, messages)
+
+    def assert_cases(self, cases):
+        """Asserts the messages of each (html, expected messages) case."""
+        # Python 2.7 has no subTest, the failing source is in the message.
+        for html, expected in cases:
+            self.assertEqual(expected, _messages(html), html)
+
     def test_doctype(self):
         # Non HTML5 doctype
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.DocumentTypeMessage(
-                line=1, column=1, declaration='<!DOCTYPE html PUBLIC>')],
-            html_linter.HTML5Linter('<!DOCTYPE html PUBLIC>').messages
+                1, 1, declaration='<!DOCTYPE html PUBLIC>')],
+            _messages('<!DOCTYPE html PUBLIC>')
         )
         # Extra whitespace
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.DocumentTypeMessage(
-                line=1, column=1, declaration='<!DOCTYPE  html>')],
-            html_linter.HTML5Linter('<!DOCTYPE  html>').messages
+                1, 1, declaration='<!DOCTYPE  html>')],
+            _messages('<!DOCTYPE  html>')
         )
         # The right doctype
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<!DOCTYPE html>').messages
-        )
+        self.assert_clean('<!DOCTYPE html>')
 
-    def test_entity_references(self):
-        self.assertEquals(
-            [html_linter.EntityReferenceMessage(
-                line=1, column=2, entity='&aacute;')],
-            html_linter.HTML5Linter(' &aacute; ').messages
-        )
+    def test_references(self):
+        self.assert_cases(_REFERENCE_CASES)
 
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(' &lt; &gt; &nbsp; &amp; ').messages
-        )
-
-    def test_entity_references_in_attributes(self):
-        self.assertEquals(
-            [html_linter.EntityReferenceMessage(
-                line=1, column=11, entity='&aacute;')],
-            html_linter.HTML5Linter('<a href=" &aacute; ">').messages
-        )
-
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<a href="&lt; &gt; &nbsp; &amp;">').messages
-        )
-
-    def test_entity_reference_must_have_semicolon(self):
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<a href="foo?foo=foo&bar=bar&baz=baz">').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<a href=" &aacute= ">').messages
-        )
-
-    def test_char_references(self):
-        self.assertEquals(
-            [html_linter.EntityReferenceMessage(
-                line=1, column=2, entity='&#32;')],
-            html_linter.HTML5Linter(' &#32; ').messages
-        )
-
-    def test_char_references_in_attributes(self):
-        self.assertEquals(
-            [html_linter.EntityReferenceMessage(
-                line=1, column=11, entity='&#32;')],
-            html_linter.HTML5Linter('<a href=" &#32; ">').messages
-        )
-
-    def test_char_reference_must_have_semicolon(self):
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<a href=" &#32= ">').messages
+    def test_entity_reference_message(self):
+        self.assertEqual(
+            'Change "&aacute;" to "\u00e1"',
+            html_linter.EntityReferenceMessage(
+                1, 2, entity='&aacute;').message
         )
 
     def test_trailing_whitespace(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.TrailingWhitespaceMessage(
-                line=1, column=4, whitespace=' ')],
-            html_linter.HTML5Linter('foo \n').messages
+                1, 4, whitespace=' ')],
+            _messages('foo \n')
         )
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.TrailingWhitespaceMessage(
-                line=1, column=4, whitespace=' '),
+                1, 4, whitespace=' '),
              html_linter.TrailingWhitespaceMessage(
-                line=2, column=5, whitespace='  ')],
-            html_linter.HTML5Linter('foo \nbarz  \n').messages
+                2, 5, whitespace='  ')],
+            _messages('foo \nbarz  \n')
         )
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.TrailingWhitespaceMessage(
-                line=1, column=4, whitespace='\t \t'),
-             html_linter.TabMessage(line=1, column=4),
-             html_linter.TabMessage(line=1, column=6)],
-            html_linter.HTML5Linter('foo\t \t\r').messages
+                1, 4, whitespace='\t \t'),
+             html_linter.TabMessage(1, 4),
+             html_linter.TabMessage(1, 6)],
+            _messages('foo\t \t\r')
         )
         # Only complaint before a newline
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('a  ').messages
-        )
+        self.assert_clean('a  ')
 
     def test_tabs(self):
-        self.assertEquals(
-            [html_linter.TabMessage(line=1, column=3)],
-            html_linter.HTML5Linter('  \t\t').messages
+        self.assertEqual(
+            [html_linter.TabMessage(1, 3)],
+            _messages('  \t\t')
         )
-        self.assertEquals(
-            [html_linter.TabMessage(line=1, column=3),
-             html_linter.TabMessage(line=2, column=1)],
-            html_linter.HTML5Linter('  \ta\n\ta').messages
+        self.assertEqual(
+            [html_linter.TabMessage(1, 3),
+             html_linter.TabMessage(2, 1)],
+            _messages('  \ta\n\ta')
         )
 
     def test_charset(self):
-        self.assertEquals(
-            [html_linter.CharsetMessage(line=1, column=16, charset='foo')],
-            html_linter.HTML5Linter('<meta charset="foo">').messages
-        )
-        self.assertEquals(
-            [html_linter.CharsetMessage(line=1, column=16, charset='UTF-8')],
-            html_linter.HTML5Linter('<meta charset="UTF-8">').messages
+        self.assertEqual(
+            [html_linter.CharsetMessage(1, 16, charset='foo')],
+            _messages('<meta charset="foo">')
         )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<meta charset="utf-8">').messages
+        self.assertEqual(
+            [html_linter.CharsetMessage(1, 16, charset='UTF-8')],
+            _messages('<meta charset="UTF-8">')
         )
+        self.assert_clean('<meta charset="utf-8">')
 
     def test_charset_not_present(self):
-        self.assertEquals(
-            [html_linter.CharsetMessage(line=1, column=1)],
-            html_linter.HTML5Linter('<meta description="foo">').messages
+        self.assertEqual(
+            [html_linter.CharsetMessage(1, 1)],
+            _messages('<meta description="foo">')
         )
         # We add the attribute so the optional tag check is not raised
-        self.assertEquals(
-            [html_linter.CharsetMessage(line=2, column=22)],
-            html_linter.HTML5Linter('\n<head data-lang="en">').messages
+        self.assertEqual(
+            [html_linter.CharsetMessage(2, 22)],
+            _messages('\n<head data-lang="en">')
         )
 
     def test_close_void_tags(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.VoidElementMessage(
-                line=1, column=4, tag='br', trailing_chars='/'),
+                1, 4, tag='br', trailing_chars='/'),
              html_linter.VoidElementMessage(
-                line=1, column=20, tag='img', trailing_chars='/'),
+                1, 20, tag='img', trailing_chars='/'),
              html_linter.VoidElementMessage(
-                line=2, column=6, tag='img')],
-            html_linter.HTML5Linter(
-                '<br/><img src="foo"/>\n<img></img>').messages
+                2, 6, tag='img')],
+            _messages(
+                '<br/><img src="foo"/>\n<img></img>')
         )
 
     def test_close_optional_tags(self):
-        self.assertEquals(
-            [html_linter.OptionalTagMessage(line=1, column=7, tag='p'),
-             html_linter.OptionalTagMessage(line=2, column=3, tag='body'),
-             html_linter.OptionalTagMessage(line=3, column=1, tag='html')],
-            html_linter.HTML5Linter('<p>foo</p>\n  </body>\n</html>').messages
+        self.assertEqual(
+            [html_linter.OptionalTagMessage(1, 7, tag='p'),
+             html_linter.OptionalTagMessage(2, 3, tag='body'),
+             html_linter.OptionalTagMessage(3, 1, tag='html')],
+            _messages('<p>foo</p>\n  </body>\n</html>')
         )
 
     def test_open_optional_tag(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.OptionalTagMessage(
-                line=1, column=1, tag='html', opening=True),
+                1, 1, tag='html', opening=True),
              html_linter.OptionalTagMessage(
-                line=1, column=10, tag='body', opening=True)],
-            html_linter.HTML5Linter('<html>foo<body>').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<html data-lang="en">foo<body data-lang="en">').messages
+                1, 10, tag='body', opening=True)],
+            _messages('<html>foo<body>')
         )
+        self.assert_clean('<html data-lang="en">foo<body data-lang="en">')
 
     def test_link_type(self):
-        self.assertEquals(
-            [html_linter.TypeAttributeMessage(line=1, column=7, tag='link')],
-            html_linter.HTML5Linter(
-                '<link type="text/css" href="foo.css">').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<link href="foo.css">\n' +
-                '<link type="foo" href="foo.foo">\n').messages
+        self.assertEqual(
+            [html_linter.TypeAttributeMessage(1, 7, tag='link')],
+            _messages(
+                '<link type="text/css" href="foo.css">')
         )
+        self.assert_clean('<link href="foo.css">\n' +
+                          '<link type="foo" href="foo.foo">\n')
 
     def test_style_type(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=1, tag='style'),
-             html_linter.TypeAttributeMessage(line=1, column=8, tag='style')],
-            html_linter.HTML5Linter('<style type="text/css">').messages
+                1, 1, tag='style'),
+             html_linter.TypeAttributeMessage(1, 8, tag='style')],
+            _messages('<style type="text/css">')
         )
 
     def test_script_type(self):
-        self.assertEquals(
-            [html_linter.TypeAttributeMessage(line=1, column=9, tag='script')],
-            html_linter.HTML5Linter(
-                '<script type="text/javascript" src="foo.js">').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<script src="foo.js">\n' +
-                '<script type="foo" src="foo.foo">\n').messages
+        self.assertEqual(
+            [html_linter.TypeAttributeMessage(1, 9, tag='script')],
+            _messages(
+                '<script type="text/javascript" src="foo.js">')
         )
+        self.assert_clean('<script src="foo.js">\n' +
+                          '<script type="foo" src="foo.foo">\n')
 
     def test_script_with_content(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=1, tag='script')],
-            html_linter.HTML5Linter('<script></script>').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<script src="foo.js"></script>').messages
+                1, 1, tag='script')],
+            _messages('<script></script>')
         )
+        self.assert_clean('<script src="foo.js"></script>')
 
     def test_inline_script_with_charset(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=1, tag='script'),
+                1, 1, tag='script'),
              html_linter.InvalidAttributeMessage(
-                line=1, column=9, attribute='charset')],
-            html_linter.HTML5Linter(
-                '<script charset="utf-8"></script>').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<script src="foo.js" charset="utf-8"></script>').messages
+                1, 9, attribute='charset')],
+            _messages(
+                '<script charset="utf-8"></script>')
         )
+        self.assert_clean('<script src="foo.js" charset="utf-8"></script>')
 
     def test_script_with_obsolete_language(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=1, tag='script'),
+                1, 1, tag='script'),
              html_linter.InvalidAttributeMessage(
-                line=1, column=9, attribute='language')],
-            html_linter.HTML5Linter(
-                '<script language="foo"></script>').messages
+                1, 9, attribute='language')],
+            _messages(
+                '<script language="foo"></script>')
         )
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.InvalidAttributeMessage(
-                line=1, column=22, attribute='language')],
-            html_linter.HTML5Linter(
-                '<script src="foo.js" language="utf-8"></script>').messages
+                1, 22, attribute='language')],
+            _messages(
+                '<script src="foo.js" language="utf-8"></script>')
         )
 
     def test_style_tag(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=1, tag='style')],
-            html_linter.HTML5Linter('<style></style>').messages
+                1, 1, tag='style')],
+            _messages('<style></style>')
         )
 
     def test_style_attribute(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=4, tag='a', attribute='style')],
-            html_linter.HTML5Linter('<a style="color:red">a</a>').messages
+                1, 4, tag='a', attribute='style')],
+            _messages('<a style="color:red">a</a>')
         )
 
     def test_a_tag_with_javascript(self):
-        self.assertEquals(
+        self.assertEqual(
+            [html_linter.ConcernsSeparationMessage(
+                1, 10, tag='a', attribute='href')],
+            _messages('<a href="javascript:foo();">')
+        )
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=10, tag='a', attribute='href')],
-            html_linter.HTML5Linter('<a href="javascript:foo();">').messages
+                1, 10, tag='a', attribute='href')],
+            _messages('<a href=" JavaScript:foo();">')
         )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<a href="foo">').messages
+        self.assertEqual(
+            [html_linter.ConcernsSeparationMessage(
+                1, 10, tag='a', attribute='href')],
+            _messages('<a href="javascript:\xa0void(0)">')
         )
+        self.assert_clean('<a href="foo">')
 
     def test_a_tag_with_void_zero(self):
-        self.assertEquals(
-            [html_linter.VoidZeroMessage(line=1, column=10),
-             html_linter.VoidZeroMessage(line=2, column=10),
-             html_linter.VoidZeroMessage(line=3, column=10)],
-            html_linter.HTML5Linter(
+        self.assertEqual(
+            [html_linter.VoidZeroMessage(1, 10),
+             html_linter.VoidZeroMessage(2, 10),
+             html_linter.VoidZeroMessage(3, 10)],
+            _messages(
                 '<a href="javascript:void(0);">\n' +
                 '<a href="javascript: void(0);">\n' +
-                '<a href="javascript: void(0)">').messages
+                '<a href="javascript: void(0)">')
+        )
+
+    def test_repeated_start_tags(self):
+        self.assertEqual(
+            [html_linter.CapitalizationMessage(
+                1, 4, tag='b', attribute='Class'),
+             html_linter.QuotationMessage(1, 10, quotation=''),
+             html_linter.CapitalizationMessage(
+                1, 21, tag='b', attribute='Class'),
+             html_linter.QuotationMessage(1, 27, quotation='')],
+            _messages(
+                '<b Class=a>x</b> <b Class=a>y</b>')
         )
 
+    def test_overridden_starttag_handler(self):
+        class Linter(html_linter.HTML5Linter):
+            # pylint: disable=too-few-public-methods
+            def _handle_style_starttag(self, unused_attrs):
+                pass
+
+        self.assertEqual([], Linter('<style>').messages)
+
     def test_a_tag_with_name_attribute(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.InvalidAttributeMessage(
-                line=1, column=4, attribute='name')],
-            html_linter.HTML5Linter('<a name="foo">').messages
+                1, 4, attribute='name')],
+            _messages('<a name="foo">')
         )
 
     def test_tag_with_event_handler(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=7, tag='body', attribute='onload')],
-            html_linter.HTML5Linter('<body onload="foo();">').messages
+                1, 7, tag='body', attribute='onload')],
+            _messages('<body onload="foo();">')
         )
 
     def test_tag_with_event_handler_and_js_protocol(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.ConcernsSeparationMessage(
-                line=1, column=7, tag='body', attribute='onload'),
+                1, 7, tag='body', attribute='onload'),
              html_linter.InvalidHandlerMessage(
-                line=1, column=15, attribute='onload')],
-            html_linter.HTML5Linter(
-                '<body onload="javascript:foo();">').messages
+                1, 15, attribute='onload')],
+            _messages(
+                '<body onload="javascript:foo();">')
         )
 
     def test_urls_have_protocol(self):
-        self.assertEquals(
-            [html_linter.ProtocolMessage(line=1, column=10, protocol='http:'),
+        self.assertEqual(
+            [html_linter.ProtocolMessage(1, 10, protocol='http:'),
              html_linter.ProtocolMessage(
-                line=2, column=11, protocol='https:')],
-            html_linter.HTML5Linter(
+                2, 11, protocol='https:')],
+            _messages(
                 '<a href="http://foo.com">\n' +
-                '<img src="https://foo.com">').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<a href="//foo.com">\n<img src="//foo.com">').messages
+                '<img src="https://foo.com">')
         )
+        self.assert_clean('<a href="//foo.com">\n<img src="//foo.com">')
+        self.assert_clean('<a href>\n<img src="">')
 
     def test_names(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.NameMessage(
-                line=1, column=10, attribute='id', value='a_b'),
+                1, 10, attribute='id', value='a_b'),
              html_linter.NameMessage(
-                line=2, column=13, attribute='class', value='Foo'),
+                2, 13, attribute='class', value='Foo'),
              html_linter.NameMessage(
-                line=3, column=13, attribute='class', value='a_b'),
+                3, 13, attribute='class', value='a_b'),
              html_linter.NameMessage(
-                line=3, column=22, attribute='id', value='Foo')],
-            html_linter.HTML5Linter(
+                3, 22, attribute='id', value='Foo')],
+            _messages(
                 '<div id="a_b">\n' +
                 '<img class="Foo">\n' +
-                '<div class="a_b" id="Foo">').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<div id="a-b">\n<img class="foo">').messages
+                '<div class="a_b" id="Foo">')
         )
+        self.assert_clean('<div id="a-b">\n<img class="foo">')
 
     def test_case(self):
-        self.assertEquals(
-            [html_linter.CapitalizationMessage(line=1, column=2, tag='A'),
+        self.assertEqual(
+            [html_linter.CapitalizationMessage(1, 2, tag='A'),
              html_linter.CapitalizationMessage(
-                line=1, column=4, tag='A', attribute='HREF'),
+                1, 4, tag='A', attribute='HREF'),
              html_linter.CapitalizationMessage(
-                line=1, column=17, tag='A', closing=True),
+                1, 17, tag='A', closing=True),
              html_linter.CapitalizationMessage(
-                line=2, column=4, tag='A', attribute='itemScope')],
-            html_linter.HTML5Linter(
-                '<A HREF="">foo</A>\n<a itemScope>').messages
+                2, 4, tag='A', attribute='itemScope')],
+            _messages(
+                '<A HREF="">foo</A>\n<a itemScope>')
         )
 
     def test_case_with_numeric_attribute(self):
         # Tests https://github.com/deezer/html-linter/issues/3, because of
         # python bug http://bugs.python.org/issue13822.
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<a href="" 0>foo</a>').messages
+        self.assert_clean('<a href="" 0>foo</a>')
+
+    def test_quote_in_tag_name(self):
+        # The attributes found inside the tag name are not checked.
+        self.assertEqual(
+            [html_linter.CapitalizationMessage(1, 2, tag='a"B')],
+            _messages('<a"B c>')
         )
+        self.assert_clean('<a\'x=y>')
 
     def test_quotation(self):
-        self.assertEquals(
-            [html_linter.QuotationMessage(line=1, column=9, quotation="'"),
-             html_linter.QuotationMessage(line=1, column=22, quotation='')],
-            html_linter.HTML5Linter('<a href=\'foo\' target=_blank>').messages
+        self.assertEqual(
+            [html_linter.QuotationMessage(1, 9, quotation="'"),
+             html_linter.QuotationMessage(1, 22, quotation='')],
+            _messages('<a href=\'foo\' target=_blank>')
         )
 
     def test_indentation(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.IndentationMessage(
-                line=2, column=1, indent=3, max_indent=2)],
-            html_linter.HTML5Linter('<div>\n   <a>').messages
+                2, 1, indent=3, max_indent=2)],
+            _messages('<div>\n   <a>')
         )
         # If we indented by something that is not a multiple of two, we
         # normalize it to a multiple of two so to minimize subsequent
         # false positives.
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.IndentationMessage(
-                line=2, column=1, indent=1, max_indent=2)],
-            html_linter.HTML5Linter('<div>\n <a>\n</div>').messages
+                2, 1, indent=1, max_indent=2)],
+            _messages('<div>\n <a>\n</div>')
         )
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.IndentationMessage(
-                line=2, column=1, indent=1, max_indent=4)],
-            html_linter.HTML5Linter('  <a></a>\n </div>\n<div>').messages
+                2, 1, indent=1, max_indent=4)],
+            _messages('  <a></a>\n </div>\n<div>')
         )
         # If we indented by something greater than the maximum allowed we
         # normalize it to the previous maximum.
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.IndentationMessage(
-                line=2, column=1, indent=3, max_indent=2)],
-            html_linter.HTML5Linter('<a></a>\n   </div>\n    <div>').messages
+                2, 1, indent=3, max_indent=2)],
+            _messages('<a></a>\n   </div>\n    <div>')
         )
         # This case should raise two warnings, because the first indentation is
         # normalized to 2 spaces and the second is 6 spaces.
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.IndentationMessage(
-                line=2, column=1, indent=3, max_indent=2),
+                2, 1, indent=3, max_indent=2),
              html_linter.IndentationMessage(
-                line=3, column=1, indent=6, max_indent=4)],
-            html_linter.HTML5Linter('<a></a>\n   </div>\n      <div>').messages
+                3, 1, indent=6, max_indent=4)],
+            _messages('<a></a>\n   </div>\n      <div>')
         )
 
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<div>\n  <a>').messages
-        )
+        self.assert_clean('<div>\n  <a>')
         # Tabs are replaced by two spaces, so we are only getting the Tab error.
-        self.assertEquals(
-            [html_linter.TabMessage(line=2, column=1)],
-            html_linter.HTML5Linter('<div>\n\t<a>').messages
+        self.assertEqual(
+            [html_linter.TabMessage(2, 1)],
+            _messages('<div>\n\t<a>')
         )
 
     def test_spaces_between_tags(self):
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<div> <a>   <img>').messages
-        )
+        self.assert_clean('<div> <a>   <img>')
 
     def test_formatting(self):
-        self.assertEquals(
-            [html_linter.FormattingMessage(line=1, column=5, tag='li'),
-             html_linter.FormattingMessage(line=1, column=9, tag='div'),
-             html_linter.FormattingMessage(line=1, column=14, tag='table'),
-             html_linter.FormattingMessage(line=1, column=21, tag='tr'),
-             html_linter.FormattingMessage(line=1, column=25, tag='td')],
-            html_linter.HTML5Linter('<ul><li><div><table><tr><td>').messages
+        self.assertEqual(
+            _EXPECTED_FORMATTING,
+            _messages(_SRC_FORMATTING)
         )
 
     def test_boolean_attribute(self):
-        self.assertEquals(
+        self.assertEqual(
             [html_linter.BooleanAttributeMessage(
-                line=1, column=21, attribute='checked', value='checked'),
+                1, 21, attribute='checked', value='checked'),
              html_linter.BooleanAttributeMessage(
-                line=2, column=8, attribute='autoplay', value='')],
-            html_linter.HTML5Linter(
+                2, 8, attribute='autoplay', value='')],
+            _messages(
                 '<input type="radio" checked="checked">\n' +
-                '<video autoplay="">').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<input type="radio" checked>\n<video autoplay>').messages
+                '<video autoplay="">')
         )
+        self.assert_clean('<input type="radio" checked>\n<video autoplay>')
 
     def test_http_equiv(self):
-        self.assertEquals(
-            [html_linter.HTTPEquivMessage(
-                line=2, column=7, http_equiv='content-type'),
-             html_linter.HTTPEquivMessage(
-                line=3, column=7, http_equiv='content-language'),
-             html_linter.HTTPEquivMessage(
-                line=4, column=7, http_equiv='pragma'),
-             html_linter.HTTPEquivMessage(
-                line=5, column=7, http_equiv='expires'),
-             html_linter.HTTPEquivMessage(
-                line=6, column=7, http_equiv='set-cookie'),
-             html_linter.HTTPEquivMessage(line=7, column=7, http_equiv='foo')],
-            html_linter.HTML5Linter(
-                '<meta charset="utf-8">\n' +
-                '<meta http-equiv="content-type">\n' +
-                '<meta http-equiv="content-language">\n' +
-                '<meta http-equiv="pragma">\n' +
-                '<meta http-equiv="expires">\n' +
-                '<meta http-equiv="set-cookie">\n' +
-                '<meta http-equiv="foo">').messages
-        )
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<meta charset="utf-8">\n' +
-                '<meta http-equiv="refresh">\n' +
-                '<meta http-equiv="default-style">\n' +
-                '<meta http-equiv="x-ua-compatible">').messages
+        self.assertEqual(
+            _EXPECTED_HTTP_EQUIV,
+            _messages(_SRC_HTTP_EQUIV)
         )
+        self.assert_clean(_SRC_VALID_HTTP_EQUIV)
 
     def test_whitespaces(self):
-        self.assertEquals(
-            [html_linter.ExtraWhitespaceMessage(line=1, column=4),
-             html_linter.ExtraWhitespaceMessage(line=1, column=10),
-             html_linter.ExtraWhitespaceMessage(line=1, column=12),
-             html_linter.ExtraWhitespaceMessage(line=1, column=18),
-             html_linter.ExtraWhitespaceMessage(line=1, column=25),
-             html_linter.ExtraWhitespaceMessage(line=1, column=27),
-             html_linter.VoidElementMessage(
-                line=1, column=32, tag='br', trailing_chars=' /')],
-            html_linter.HTML5Linter(
-                '<a   href = "foo" >Foo</ a ><br />').messages
+        self.assertEqual(
+            _EXPECTED_WHITESPACES,
+            _messages(_SRC_WHITESPACES)
         )
         # The br only raises a VoidElementMessage and not an
         # ExtraWhitespaceMessage because we want to reduce the number of
         # messages and the VoidElementMessage alreadys asks to remove the
         # whitespace.
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter('<a href="foo">Foo</a>').messages
-        )
+        self.assert_clean('<a href="foo">Foo</a>')
 
     def test_multiline_tag_whitespaces(self):
-        self.assertEquals(
-            [],
-            html_linter.HTML5Linter(
-                '<a href="foo"\n  target="_blank">Foo</a>').messages
-        )
+        self.assert_clean('<a href="foo"\n  target="_blank">Foo</a>')
+
+    def test_multiline_tag_form_feed(self):
+        # A form feed does not start a new line within the tag.
+        self.assertEqual(
+            [html_linter.NameMessage(
+                2, 10, attribute='class', value='A'),
+             html_linter.QuotationMessage(2, 10, quotation='')],
+            _messages('<p>\n<i\x0cclass=A>')
+        )
+
+    def test_get_messages(self):
+        linter = html_linter.HTML5Linter('<p>\t</p>\n')
+        self.assertEqual(
+            [html_linter.TabMessage(1, 4),
+             html_linter.OptionalTagMessage(1, 5, tag='p')],
+            linter.get_messages())
+        self.assertEqual(
+            [html_linter.TabMessage(1, 4)],
+            linter.get_messages(exclude=[html_linter.OptionalTagMessage]))
+        # Excluding a base class excludes all its subclasses.
+        self.assertEqual([],
+                         linter.get_messages(exclude=[html_linter.Message]))
+        self.assertEqual(linter.get_messages(), linter.messages)
 
 
 class TestHTML5LinterFunction(unittest.TestCase):
+    @staticmethod
+    def read_data(data_dir, filename):
+        """Returns the decoded contents of the given data file."""
+        with open(os.path.join(data_dir, filename), 'rb') as data_file:
+            return data_file.read().decode('utf-8')
+
     @classmethod
     def setUpClass(cls):
-        cls.invalid_html = io.open(os.path.join(os.path.dirname(__file__),
-                                                'data',
-                                                'invalid.html')).read()
-        cls.valid_html = io.open(os.path.join(os.path.dirname(__file__),
-                                              'data',
-                                              'valid.html')).read()
+        data_dir = os.path.join(os.path.dirname(__file__), 'data')
+        cls.invalid_html = cls.read_data(data_dir, 'invalid.html')
+        cls.valid_html = cls.read_data(data_dir, 'valid.html')
 
     def test_invalid(self):
-        self.assertEquals(
-            49, len(html_linter.lint(self.invalid_html).split('\n')))
-        self.assertEquals(
-            48,
-            len(html_linter.lint(
-                self.invalid_html,
-                exclude=[html_linter.HTTPEquivMessage]).split('\n')))
-        self.assertEquals(
-            43,
-            len(html_linter.lint(
-                self.invalid_html,
-                exclude=[html_linter.HTTPEquivMessage,
-                         html_linter.OptionalTagMessage]).split('\n')))
+        # Parse the file once and filter its messages for each assertion.
+        linter = html_linter.HTML5Linter(self.invalid_html)
+        self.assertEqual(49, len(linter.get_messages()))
+        self.assertEqual(48, len(linter.get_messages(
+            exclude=[html_linter.HTTPEquivMessage])))
+        exclude = [html_linter.HTTPEquivMessage,
+                   html_linter.OptionalTagMessage]
+        messages = linter.get_messages(exclude=exclude)
+        self.assertEqual(43, len(messages))
+
+        output = html_linter.lint(self.invalid_html, exclude=exclude)
+        self.assertEqual(43, output.count('\n') + 1)
+        self.assertEqual('\n'.join(m.__unicode__() for m in messages), output)
 
     def test_valid(self):
-        self.assertEquals('', html_linter.lint(self.valid_html))
+        self.assertEqual('', html_linter.lint(self.valid_html))
 
 
 class TestHTML5LinterUtils(unittest.TestCase):
@@ -580,57 +594,193 @@ class TestHTML5LinterUtils(unittest.TestCase):
 
         return linter
 
+    def test_message_equality(self):
+        self.assertEqual(html_linter.TabMessage(1, 2),
+                         html_linter.TabMessage(1, 2))
+        self.assertNotEqual(html_linter.TabMessage(1, 2),
+                            html_linter.TabMessage(1, 3))
+        self.assertNotEqual(
+            html_linter.ProtocolMessage(1, 2, protocol='http:'),
+            html_linter.ProtocolMessage(1, 2, protocol='https:'))
+        self.assertNotEqual(
+            html_linter.TabMessage(1, 2),
+            html_linter.ExtraWhitespaceMessage(1, 2))
+
+    def test_set_message(self):
+        message = html_linter.ProtocolMessage(1, 2, protocol='http:')
+        message.message = 'Keep 100% of the "http:" protocol'
+        self.assertEqual('Keep 100% of the "http:" protocol', message.message)
+        message = html_linter.TabMessage(1, 2)
+        message.message = None
+        self.assertEqual(None, message.message)
+        message = html_linter.EntityReferenceMessage(1, 2, entity='&amp;')
+        message.message = 'Keep the "&amp;"'
+        self.assertEqual('Keep the "&amp;"', message.message)
+
+    def test_set_description(self):
+        message = html_linter.NameMessage(1, 2, attribute='id', value='a_b')
+        self.assertEqual('The id names should be lowercase and with hyphens ' +
+                         'instead of underscores', message.description)
+        message.description = '100% lowercase'
+        self.assertEqual('100% lowercase', message.description)
+
+    def test_message_without_text(self):
+        message = html_linter.Message(1, 2)
+        self.assertEqual(None, message.message)
+        self.assertEqual('1:2: Error: None: None: None.', str(message))
+        message = html_linter.ConcernsSeparationMessage(
+            1, 2, tag='div', attribute='id')
+        self.assertEqual(None, message.message)
+        self.assertEqual('1:2: Error: Separation of concerns: None: None.',
+                         str(message))
+        message = html_linter.InvalidAttributeMessage(1, 2, attribute='foo')
+        self.assertEqual(None, message.message)
+        self.assertEqual('1:2: Error: Invalid Attributes: None: None.',
+                         str(message))
+
     def test_get_indentation(self):
-        self.assertEquals(
+        self.assertEqual(
             None, self.get_linter(' ', (1, 0))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             None, self.get_linter(' ', (1, 2))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             None, self.get_linter(' a', (1, 1))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             1, self.get_linter(' ', (1, 1))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             2, self.get_linter('  ', (1, 1))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             2, self.get_linter('\t', (1, 1))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             4, self.get_linter('\t\t', (1, 1))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             5, self.get_linter('\t \t', (1, 1))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             3, self.get_linter(' \n \n   ', (1, 2))._get_indentation())
-        self.assertEquals(
+        self.assertEqual(
             None, self.get_linter(' \n \n   a', (1, 2))._get_indentation())
 
+    def test_get_line_breaks(self):
+        self.assertEqual([], html_linter.get_line_breaks('foo'))
+        self.assertEqual([3, 7], html_linter.get_line_breaks('foo\nbar\n'))
+        self.assertEqual([3, 8], html_linter.get_line_breaks('foo\r\nbar\r'))
+        self.assertEqual([0, 1], html_linter.get_line_breaks('\n\r'))
+        self.assertEqual(
+            [4], html_linter.get_line_breaks('\x0b\x0c\x85\u2028\n'))
+
     def test_get_line_column(self):
-        self.assertEquals((2, 10),
-                          html_linter.get_line_column('foo', 2, 8, 2))
-        self.assertEquals((3, 3),
-                          html_linter.get_line_column('foo\nbar', 2, 8, 6))
-        self.assertEquals((3, 3),
-                          html_linter.get_line_column('foo\nbar\n', 2, 8, 6))
-        self.assertEquals((3, 4),
-                          html_linter.get_line_column('foo\nbar\n', 2, 8, 7))
-        self.assertEquals((4, 1),
-                          html_linter.get_line_column('foo\nbar\n', 2, 8, 8))
+        self.assertEqual((2, 10),
+                         html_linter.get_line_column('foo', 2, 8, 2))
+        self.assertEqual((3, 3),
+                         html_linter.get_line_column('foo\nbar', 2, 8, 6))
+        self.assertEqual((3, 3),
+                         html_linter.get_line_column('foo\nbar\n', 2, 8, 6))
+        self.assertEqual((3, 4),
+                         html_linter.get_line_column('foo\nbar\n', 2, 8, 7))
+        self.assertEqual((4, 1),
+                         html_linter.get_line_column('foo\nbar\n', 2, 8, 8))
+        self.assertEqual((3, 1),
+                         html_linter.get_line_column('foo\r\nbar', 2, 8, 4))
+        self.assertEqual((3, 1),
+                         html_linter.get_line_column('foo\r\nbar', 2, 8, 5))
+        self.assertEqual((3, 2),
+                         html_linter.get_line_column('foo\rbar', 2, 8, 5))
+        self.assertEqual((4, 1),
+                         html_linter.get_line_column('a\r\nb\nc', 2, 8, 5))
+        self.assertEqual((3, 3),
+                         html_linter.get_line_column('foo\nbar', 2, 8, 6,
+                                                     [3]))
+
+    def test_unescape(self):
+        self.assertEqual('\xa0', html_linter.unescape('&nbsp;'))
+        self.assertEqual('\xe9', html_linter.unescape('&#233;'))
+        self.assertEqual('\xe9', html_linter.unescape('&#xe9;'))
+        self.assertEqual('a & b', html_linter.unescape('a &amp; b'))
+        # The shared parser must not keep any state between calls.
+        self.assertEqual('<>', html_linter.unescape('&lt;&gt;'))
+        self.assertEqual('foo', html_linter.unescape('foo'))
+
+    def test_has_only_characters(self):
+        self.assertTrue(html_linter.has_only_characters(
+            'foo-bar2', html_linter.ID_CHARACTERS))
+        self.assertTrue(html_linter.has_only_characters(
+            '', html_linter.ID_CHARACTERS))
+        self.assertTrue(html_linter.has_only_characters(
+            'foo\n', html_linter.ID_CHARACTERS))
+        self.assertTrue(html_linter.has_only_characters(
+            'foo bar', html_linter.CLASS_CHARACTERS))
+        self.assertFalse(html_linter.has_only_characters(
+            'foo bar', html_linter.ID_CHARACTERS))
+        self.assertFalse(html_linter.has_only_characters(
+            'fooBar', html_linter.CLASS_CHARACTERS))
+        self.assertFalse(html_linter.has_only_characters(
+            'foo_bar', html_linter.CLASS_CHARACTERS))
+        self.assertFalse(html_linter.has_only_characters(
+            'foo\n\n', html_linter.ID_CHARACTERS))
+        self.assertFalse(html_linter.has_only_characters(
+            '\xe9', html_linter.ID_CHARACTERS))
+
+    def test_is_void_zero(self):
+        self.assertTrue(html_linter.is_void_zero('javascript:void(0)'))
+        self.assertTrue(html_linter.is_void_zero('javascript:void(0);'))
+        self.assertTrue(html_linter.is_void_zero('JavaScript: void ( 0 ) ;'))
+        self.assertTrue(html_linter.is_void_zero('javascript:\tvoid\n(0)'))
+        self.assertFalse(html_linter.is_void_zero('javascript:void(0);;'))
+        self.assertFalse(html_linter.is_void_zero('javascript:void(1)'))
+        self.assertFalse(html_linter.is_void_zero('javascript:vo id(0)'))
+        self.assertFalse(html_linter.is_void_zero('void(0)'))
+        # Only ASCII whitespace and letters are ignored.
+        self.assertFalse(html_linter.is_void_zero('javascript:\xa0void(0)'))
+        self.assertFalse(html_linter.is_void_zero('javascript:void(\x1c0)'))
+        self.assertFalse(html_linter.is_void_zero('javascript:void(0)\u3000;'))
+        self.assertFalse(html_linter.is_void_zero('javascr\u0130pt:void(0)'))
+        self.assertFalse(html_linter.is_void_zero(''))
+
+    def test_scan_attributes(self):
+        self.assertEqual([], html_linter.scan_attributes('<br>'))
+        self.assertEqual(
+            [('href', 3, '"foo"', 8), ('target', 14, '_blank', 21),
+             ('itemprop', 28, None, None)],
+            html_linter.scan_attributes(
+                '<a href="foo" target=_blank itemprop>'))
+        self.assertEqual(
+            [('title', 4, "'a > b'", 12), ('id', 20, '', 23)],
+            html_linter.scan_attributes('<p\n title = \'a > b\'\tid=>'))
+        # Unclosed quotes behave as in HTMLParser.attrfind.
+        self.assertEqual(
+            [('href', 3, '', 8), ('"foo', 9, None, None)],
+            html_linter.scan_attributes('<a href= "foo>'))
+        self.assertEqual(
+            [("z'", 8, None, None)],
+            html_linter.scan_attributes('<a\'x=\'y z\'>', 7))
+
+    def test_get_attribute_index(self):
+        index = html_linter.get_attribute_index(
+            html_linter.scan_attributes(
+                '<a HREF="foo" target="_blank" href="bar">'))
+        self.assertEqual(['href', 'target'], sorted(index))
+        self.assertEqual(('HREF', 3, '"foo"', 8), index['href'])
+        self.assertEqual(('target', 14, '"_blank"', 21), index['target'])
+
+        self.assertEqual({}, html_linter.get_attribute_index([]))
 
     def test_get_attribute_line_column(self):
-        self.assertEquals(
+        self.assertEqual(
             (2, 11),
             html_linter.get_attribute_line_column(
                 '<a href="foo">', 2, 8, 'href'))
 
-        self.assertEquals(
+        self.assertEqual(
             (3, 3),
             html_linter.get_attribute_line_column(
                 '<a href="foo"\n  target="_blank">', 2, 8, 'target'))
 
-        self.assertEquals(
+        self.assertEqual(
             (3, 19),
             html_linter.get_attribute_line_column(
                 '<a href="foo"\n  target="_blank" itemprop>', 2, 8, 'itemprop'))
 
-        self.assertEquals(
+        self.assertEqual(
             (3, 2),
             html_linter.get_attribute_line_column(
                 '<a href=" itemprop "\n itemprop>', 2, 8, 'itemprop'))
@@ -640,37 +790,37 @@ class TestHTML5LinterUtils(unittest.TestCase):
                 '<a href=" itemprop "\n itemprop>', 2, 8, 'target')
 
     def test_get_value_line_column(self):
-        self.assertEquals(
+        self.assertEqual(
             (2, 17),
             html_linter.get_value_line_column(
                 '<a href="foo">', 2, 8, 'href'))
 
-        self.assertEquals(
+        self.assertEqual(
             (2, 17),
             html_linter.get_value_line_column(
                 '<a href=\'foo\'>', 2, 8, 'href'))
 
-        self.assertEquals(
+        self.assertEqual(
             (2, 16),
             html_linter.get_value_line_column(
                 '<a href=foo>', 2, 8, 'href'))
 
-        self.assertEquals(
+        self.assertEqual(
             (2, 18),
             html_linter.get_value_line_column(
                 '<a href= "foo">', 2, 8, 'href'))
 
-        self.assertEquals(
+        self.assertEqual(
             (3, 11),
             html_linter.get_value_line_column(
                 '<a href="foo"\n  target="_blank">', 2, 8, 'target'))
 
-        self.assertEquals(
+        self.assertEqual(
             (3, 27),
             html_linter.get_value_line_column(
                 '<a href="foo"\n  target="_blank" itemprop>', 2, 8, 'itemprop'))
 
-        self.assertEquals(
+        self.assertEqual(
             (3, 10),
             html_linter.get_value_line_column(
                 '<a href=" itemprop "\n itemprop>', 2, 8, 'itemprop'))